@@ -1,53 +1,389 @@
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlparse
 import json
 import time
+import asyncio
 from collections import deque
 
-def crawl_website(main_url, delay=0.5):
-    queue = deque([main_url])
-    visited = set([main_url])
-    ordered_links = [main_url]
+import aiohttp
+
+from frontier import CrawlFrontier, DONE, DUPLICATE, SKIPPED, ERROR
+from politeness import HostScheduler, PacedSession, THROTTLE_STATUSES
+from httpcache import (BodyReader, BodyRejected, CHUNK_SIZE, DEFAULT_MAX_BODY_BYTES, fetch_streamed,
+                       resolve_cache)
+from sitemap import iter_site_urls
+from linkextract import iter_page_links
+from netprobe import complete_timing, timing_trace_config
+from robots import resolve_robots
+
+SKIPPED_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.gif', '.pdf', '.zip']
+THROTTLE_RETRIES = 2
+SEED_BATCH_SIZE = 5000
+
+def is_crawlable(parsed_url, base_domain):
+    return (parsed_url.netloc == base_domain and
+            not any(ext in parsed_url.path.lower() for ext in SKIPPED_EXTENSIONS))
+
+def extract_links(body, current_url, base_domain, encoding='utf-8', canonicalize=None):
+    """Return same-domain, fragment-free page links found in the raw HTML, in document order.
+
+    ``canonicalize`` (e.g. a ``canonicalurl.UrlCanonicalizer``) rewrites each link before it is returned.
+    """
+    links = []
+
+    for full_url in iter_page_links(body, current_url, encoding):
+        parsed_url = urlparse(full_url)
+
+        clean_url = parsed_url._replace(fragment='').geturl()
+
+        if is_crawlable(parsed_url, base_domain):
+            links.append(canonicalize(clean_url) if canonicalize else clean_url)
+
+    return links
+
+def seed_from_sitemaps(frontier, main_url, canonicalize=None, robots=None):
+    """Queue every same-domain page listed in the site's sitemaps"""
+    base_domain = urlparse(main_url).netloc
+    batch = []
+    seeded = 0
+
+    for url in iter_site_urls(main_url, robots=robots):
+        parsed_url = urlparse(url)
+        if is_crawlable(parsed_url, base_domain):
+            clean_url = parsed_url._replace(fragment='').geturl()
+            batch.append(canonicalize(clean_url) if canonicalize else clean_url)
+        if len(batch) >= SEED_BATCH_SIZE:
+            seeded += frontier.add_many(batch)
+            batch = []
+
+    seeded += frontier.add_many(batch)
+    print(f"Seeded {seeded} URLs from sitemaps")
+
+def open_frontier(main_url, frontier_path=None, use_sitemap=False, canonicalize=None, robots=None):
+    """Open the crawl frontier and return it with the BFS queue, visited set and ordered links"""
+    frontier = CrawlFrontier(frontier_path or ':memory:')
+    resumed = frontier.start(main_url)
+
+    if resumed:
+        print(f"Resuming crawl of {main_url}")
+    elif use_sitemap:
+        # ``robots`` is already resolved here, so None means robots.txt is ignored
+        seed_from_sitemaps(frontier, main_url, canonicalize, robots if robots is not None else False)
+
+    ordered_links = frontier.links()
+    queue = deque(frontier.pending())
+    print(f"{len(ordered_links)} URLs known, {len(queue)} pending")
+
+    return frontier, queue, set(ordered_links), ordered_links
+
+def error_status(error):
+    """HTTP status code carried by a fetch error, if any"""
+    response = getattr(error, 'response', None)
+    if response is not None:
+        return response.status_code
+    return getattr(error, 'status', None)
+
+def is_html(response):
+    return 'text/html' in response.headers.get('Content-Type', '').lower()
+
+def apply_crawl_delay(scheduler, main_url, robots):
+    """Read the site's robots.txt Crawl-delay into the scheduler"""
+    crawl_delay = robots.crawl_delay(main_url)
+    if crawl_delay:
+        print(f"Honoring Crawl-delay of {crawl_delay}s")
+        scheduler.set_crawl_delay(urlparse(main_url).netloc, crawl_delay)
+
+def robots_disallows(robots, frontier, url):
+    """Mark the URL skipped and return True when robots.txt forbids fetching it"""
+    if robots is None or robots.allowed(url):
+        return False
+    print(f"Disallowed by robots.txt: {url}")
+    frontier.mark(url, SKIPPED)
+    return True
+
+def is_duplicate_page(dedupe, frontier, url, response):
+    """Mark the URL duplicate and return True when its text nearly matches an earlier page's"""
+    if dedupe is None:
+        return False
+    original = dedupe.check_page(url, response.content, response.encoding or 'utf-8')
+    if original is None:
+        return False
+    print(f"  Near duplicate of {original}")
+    frontier.mark(url, DUPLICATE, response.status_code)
+    return True
+
+def fetch_page(url, session, cache=None, timeout=10, max_body_bytes=DEFAULT_MAX_BODY_BYTES):
+    """GET a page with the crawl's ``PacedSession``, retrying throttled (429/503) responses after backoff.
+
+    With a cache, fresh copies are returned without a request and stale ones revalidated.
+    Bodies are streamed: non-HTML ones are never downloaded and oversized ones raise ``BodyRejected``.
+    """
+    for attempt in range(THROTTLE_RETRIES + 1):
+        if cache is not None:
+            response = cache.fetch(url, session=session, timeout=timeout, accept=is_html)
+        else:
+            response = fetch_streamed(url, session, timeout=timeout, accept=is_html, max_bytes=max_body_bytes)
+        if response.status_code not in THROTTLE_STATUSES:
+            break
+    return response
+
+def completed_links(ordered_links, duplicates, robots=None):
+    """Discovered links in BFS order, without robots.txt-disallowed URLs and with near-duplicate
+    pages collapsed into their first copy"""
+    disallowed = {url for url in ordered_links if not robots.allowed(url)} if robots is not None else set()
+    notes = []
+    if duplicates:
+        notes.append(f"{len(duplicates)} near duplicates collapsed")
+    if disallowed:
+        notes.append(f"{len(disallowed)} disallowed by robots.txt")
+    if notes:
+        ordered_links = [url for url in ordered_links if url not in duplicates and url not in disallowed]
+        print(f"\nCrawling completed. Found {len(ordered_links)} pages ({', '.join(notes)}).")
+    else:
+        print(f"\nCrawling completed. Found {len(ordered_links)} pages.")
+    return ordered_links
+
+def crawl_website(main_url, delay=0.0, workers=None, frontier_path=None, scheduler=None,
+                  use_sitemap=False, follow_links=True, cache=None, on_page=None,
+                  max_body_bytes=DEFAULT_MAX_BODY_BYTES, robots=None, dedupe=None, canonicalize=None):
+    """Crawl a site breadth-first and return the ordered list of discovered links.
+
+    Requests are paced per host by a ``HostScheduler`` (response latency,
+    robots.txt Crawl-delay and 429/503 backoff); ``delay`` is the minimum
+    interval between requests to the same host.
+    With ``workers`` set, pages are fetched concurrently by the asyncio engine
+    (see ``async_crawl_website``); the returned list is the same BFS order.
+    With ``frontier_path`` set, progress is checkpointed to that SQLite file and
+    an interrupted crawl of the same URL resumes where it stopped.
+    With ``use_sitemap`` set, the frontier is seeded from the site's (streamed)
+    sitemaps first; with ``follow_links=False`` as well, the sitemap URLs are
+    returned without fetching any page.
+    Fetches go through the shared HTTP cache unless ``cache=False``.
+    ``on_page(url, response)`` is called with every fetched HTML page so the
+    response can be handed straight to ``SEOAnalyzer.from_response``.
+    Pages whose body exceeds ``max_body_bytes`` (the cache's own limit when
+    cached) are abandoned mid-download and marked skipped.
+    URLs disallowed by robots.txt are skipped, left out of the returned list and
+    its Crawl-delay honored, using the shared ``RobotsCache`` unless ``robots``
+    is given (``robots=False`` ignores robots.txt). Sitemaps listed in
+    robots.txt are read from the same cache.
+    With ``dedupe`` (a ``neardup.NearDuplicateIndex``), pages whose text nearly
+    matches an earlier page still have their links followed, but are marked
+    duplicate, not passed to ``on_page`` and left out of the returned list.
+    ``canonicalize`` (e.g. a ``canonicalurl.UrlCanonicalizer``) rewrites every
+    discovered URL first, so query-string variants are only queued once.
+    """
+    scheduler = scheduler or HostScheduler(min_delay=delay)
+    if workers:
+        return asyncio.run(async_crawl_website(main_url, max_workers=workers, frontier_path=frontier_path,
+                                               scheduler=scheduler, use_sitemap=use_sitemap,
+                                               follow_links=follow_links, cache=cache, on_page=on_page,
+                                               max_body_bytes=max_body_bytes, robots=robots, dedupe=dedupe,
+                                               canonicalize=canonicalize))
+
+    cache = resolve_cache(cache)
+    robots = resolve_robots(robots)
+    frontier, queue, visited, ordered_links = open_frontier(main_url, frontier_path, use_sitemap, canonicalize,
+                                                            robots)
+    duplicates = set(frontier.with_status(DUPLICATE))
     base_domain = urlparse(main_url).netloc
-    
+    if not follow_links:
+        queue.clear()
+    elif robots is not None:
+        apply_crawl_delay(scheduler, main_url, robots)
+
     print(f"Starting to crawl {main_url}")
-    
-    while queue:
-        current_url = queue.popleft()
-        print(f"Crawling: {current_url}")
-        
-        try:
-            time.sleep(delay)
-            response = requests.get(current_url, timeout=10)
-            response.raise_for_status()
-            
-            content_type = response.headers.get('Content-Type', '')
-            if 'text/html' not in content_type.lower():
+    # One keep-alive session for the whole crawl, paced per host by the scheduler
+    session = PacedSession(scheduler)
+
+    try:
+        while queue:
+            current_url = queue.popleft()
+            if robots_disallows(robots, frontier, current_url):
                 continue
-                
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            for link in soup.find_all('a', href=True):
-                href = link.get('href')
-                full_url = urljoin(current_url, href)
-                parsed_url = urlparse(full_url)
-                
-                clean_url = parsed_url._replace(fragment='').geturl()
-                
-                if (parsed_url.netloc == base_domain and 
-                    clean_url not in visited and
-                    not any(ext in parsed_url.path.lower() for ext in ['.jpg', '.jpeg', '.png', '.gif', '.pdf', '.zip'])):
-                    
-                    queue.append(clean_url)
-                    visited.add(clean_url)
-                    ordered_links.append(clean_url)
-                    print(f"  Found: {clean_url}")
-                    
-        except requests.exceptions.RequestException as e:
-            print(f"  Error fetching {current_url}: {e}")
-        except Exception as e:
-            print(f"  Error processing {current_url}: {e}")
-    
-    print(f"\nCrawling completed. Found {len(ordered_links)} pages.")
-    return ordered_links
\ No newline at end of file
+            print(f"Crawling: {current_url}")
+
+            try:
+                response = fetch_page(current_url, session, cache, max_body_bytes=max_body_bytes)
+                response.raise_for_status()
+
+                if not is_html(response):
+                    frontier.mark(current_url, SKIPPED, response.status_code)
+                    continue
+
+                for clean_url in extract_links(response.content, current_url, base_domain,
+                                               response.encoding or 'utf-8', canonicalize):
+                    if clean_url not in visited:
+                        queue.append(clean_url)
+                        visited.add(clean_url)
+                        ordered_links.append(clean_url)
+                        frontier.add(clean_url)
+                        print(f"  Found: {clean_url}")
+
+                if is_duplicate_page(dedupe, frontier, current_url, response):
+                    duplicates.add(current_url)
+                    continue
+
+                frontier.mark(current_url, DONE, response.status_code)
+                if on_page is not None:
+                    on_page(current_url, response)
+
+            except BodyRejected as e:
+                print(f"  Skipping {current_url}: {e}")
+                frontier.mark(current_url, SKIPPED)
+            except requests.exceptions.RequestException as e:
+                print(f"  Error fetching {current_url}: {e}")
+                frontier.mark_error(current_url, error_status(e))
+            except Exception as e:
+                print(f"  Error processing {current_url}: {e}")
+                frontier.mark(current_url, ERROR)
+        frontier.finish()
+    finally:
+        session.close()
+        frontier.close()
+
+    return completed_links(ordered_links, duplicates, robots)
+
+async def fetch_html(session, semaphore, scheduler, url, timeout=10, cache=None,
+                     max_body_bytes=DEFAULT_MAX_BODY_BYTES):
+    """Fetch a page with the shared session and return it as a ``CachedResponse``.
+
+    Fresh cached copies are returned without a request; stale ones are revalidated.
+    HTML bodies are read in chunks under ``max_body_bytes`` and decoded as they arrive.
+    When the session traces requests (``netprobe.timing_trace_config``), the
+    response's ``timing`` holds the network breakdown, and is cached with it.
+    """
+    cached = None
+    headers = None
+    if cache is not None:
+        cached, age = cache.get(url)
+        if cached is not None:
+            if cache.is_fresh(age, cached):
+                return cached
+            headers = cache.conditional_headers(url)
+
+    host = urlparse(url).netloc
+    async with semaphore:
+        for attempt in range(THROTTLE_RETRIES + 1):
+            await scheduler.wait(host)
+            started = time.monotonic()
+            timing = {}
+            async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout),
+                                   trace_request_ctx=timing) as response:
+                scheduler.record(host, time.monotonic() - started, response.status,
+                                 response.headers.get('Retry-After'))
+                if response.status in THROTTLE_STATUSES and attempt < THROTTLE_RETRIES:
+                    continue
+
+                if response.status == 304 and cached is not None:
+                    cache.touch(url)
+                    return cached
+
+                response.raise_for_status()
+
+                reader = BodyReader(str(response.url), response.charset, max_body_bytes,
+                                    response.headers.get('Content-Length'))
+                download_start = time.perf_counter()
+                if is_html(response):
+                    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                        reader.feed(chunk)
+
+                page = reader.response(response.status, dict(response.headers), time.monotonic() - started)
+                page.timing = complete_timing(timing, download_start, round(page.elapsed * 1000, 2),
+                                              getattr(response.content, 'total_raw_bytes', None),
+                                              len(page.content), response.headers.get('Content-Encoding'))
+                if cache is not None and page.content:
+                    cache.store(url, page)
+                return page
+
+async def async_crawl_website(main_url, max_workers=20, per_host_limit=8, timeout=10, frontier_path=None,
+                              scheduler=None, use_sitemap=False, follow_links=True, cache=None, on_page=None,
+                              max_body_bytes=DEFAULT_MAX_BODY_BYTES, robots=None, dedupe=None, canonicalize=None):
+    """Concurrent breadth-first crawl returning the same ordered links as ``crawl_website``.
+
+    Up to ``max_workers`` requests are in flight at once (at most ``per_host_limit``
+    per host) over pooled keep-alive connections. Pages are prefetched ahead of the
+    BFS cursor but processed strictly in queue order, so discovery order is unchanged.
+    Request starts are paced per host by ``scheduler`` (a ``HostScheduler``),
+    and pages go through the shared HTTP cache unless ``cache=False``.
+    robots.txt rules, Crawl-delay, ``dedupe`` and ``canonicalize`` behave as in ``crawl_website``.
+    """
+    cache = resolve_cache(cache)
+    robots = resolve_robots(robots)
+    frontier, queue, visited, ordered_links = open_frontier(main_url, frontier_path, use_sitemap, canonicalize,
+                                                            robots)
+    duplicates = set(frontier.with_status(DUPLICATE))
+    base_domain = urlparse(main_url).netloc
+    prefetch = max_workers * 4
+    scheduler = scheduler or HostScheduler()
+    if not follow_links:
+        queue.clear()
+    elif robots is not None:
+        apply_crawl_delay(scheduler, main_url, robots)
+
+    print(f"Starting to crawl {main_url} with {max_workers} workers")
+
+    semaphore = asyncio.Semaphore(max_workers)
+    connector = aiohttp.TCPConnector(limit=max_workers, limit_per_host=per_host_limit)
+
+    async with aiohttp.ClientSession(connector=connector, trace_configs=[timing_trace_config()]) as session:
+        pending = {}
+        unscheduled = deque(queue)
+
+        def schedule():
+            # Keep a bounded window of fetches running ahead of the BFS cursor
+            while unscheduled and len(pending) < prefetch:
+                url = unscheduled.popleft()
+                if robots is not None and not robots.allowed(url):
+                    continue
+                pending[url] = asyncio.create_task(fetch_html(session, semaphore, scheduler, url, timeout, cache,
+                                                                max_body_bytes))
+
+        try:
+            while queue:
+                schedule()
+                current_url = queue.popleft()
+                if robots_disallows(robots, frontier, current_url):
+                    continue
+                print(f"Crawling: {current_url}")
+
+                try:
+                    response = await pending.pop(current_url)
+                    if not is_html(response):
+                        frontier.mark(current_url, SKIPPED, response.status_code)
+                        continue
+
+                    for clean_url in extract_links(response.content, current_url, base_domain,
+                                                   response.encoding or 'utf-8', canonicalize):
+                        if clean_url not in visited:
+                            queue.append(clean_url)
+                            unscheduled.append(clean_url)
+                            visited.add(clean_url)
+                            ordered_links.append(clean_url)
+                            frontier.add(clean_url)
+                            print(f"  Found: {clean_url}")
+
+                    if is_duplicate_page(dedupe, frontier, current_url, response):
+                        duplicates.add(current_url)
+                        continue
+
+                    frontier.mark(current_url, DONE, response.status_code)
+                    if on_page is not None:
+                        on_page(current_url, response)
+
+                except BodyRejected as e:
+                    print(f"  Skipping {current_url}: {e}")
+                    frontier.mark(current_url, SKIPPED)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    print(f"  Error fetching {current_url}: {e}")
+                    frontier.mark_error(current_url, error_status(e))
+                except Exception as e:
+                    print(f"  Error processing {current_url}: {e}")
+                    frontier.mark(current_url, ERROR)
+            frontier.finish()
+        finally:
+            for task in pending.values():
+                task.cancel()
+            frontier.close()
+
+    return completed_links(ordered_links, duplicates, robots)
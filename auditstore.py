@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import zlib
+
+from pagefacts import PageFacts
+from sqlitestore import SharedDefault, open_database
+
+DEFAULT_AUDIT_PATH = os.path.join('.cache', 'audits.sqlite')
+
+# The body of an inline script (only its presence is counted), kept as an empty element
+INLINE_SCRIPT_PATTERN = re.compile(
+    rb'(<script\b(?![^>]*\bsrc\s*=)[^>]*>).*?(</script\s*>)',
+    re.IGNORECASE | re.DOTALL
+)
+# Markup that changes on every fetch of an unchanged page and that the analysis never reads:
+# comments, CSP nonces and hidden form fields such as CSRF tokens
+VOLATILE_MARKUP_PATTERN = re.compile(
+    rb'<!--.*?-->|\snonce\s*=\s*(?:"[^"]*"|\'[^\']*\'|[^\s>]+)|<input\b[^>]*\btype\s*=\s*["\']?hidden\b[^>]*>',
+    re.IGNORECASE | re.DOTALL
+)
+WHITESPACE_PATTERN = re.compile(rb'\s+')
+
+def content_hash(response):
+    """SHA-256 of a page's markup with volatile parts removed and whitespace collapsed.
+
+    Tags, attributes and visible text (everything ``DomFacts`` reads) are
+    kept, so results are reused only when the analysis would see the same page.
+    """
+    body = INLINE_SCRIPT_PATTERN.sub(rb'\1\2', response.content)
+    body = VOLATILE_MARKUP_PATTERN.sub(b'', body)
+    body = WHITESPACE_PATTERN.sub(b' ', body).strip()
+    return hashlib.sha256(body).hexdigest()
+
+def pack(value):
+    return zlib.compress(json.dumps(value, default=str, separators=(',', ':')).encode('utf-8'))
+
+def unpack(blob):
+    return json.loads(zlib.decompress(blob)) if blob is not None else None
+
+class AuditStore:
+    """Local database of structured ``SEOAnalyzer`` results, keyed by URL and content hash.
+
+    Results are stored once per distinct page body, with their issues in a
+    separate table so they can be queried. Every site audit is a run that
+    records which version of each page it saw. A re-audit reuses the stored
+    results of pages whose content has not changed, and ``AuditRun.diff`` lists
+    the issues that appeared or were resolved since the previous run.
+    Site-wide facts (robots.txt, sitemap, HTTP/2) and load time in reused
+    results are those of the run that first analyzed the page.
+    """
+
+    def __init__(self, path=DEFAULT_AUDIT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = open_database(path, """
+            CREATE TABLE IF NOT EXISTS results (
+                url TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                results BLOB NOT NULL,
+                terms BLOB,
+                analyzed_at REAL,
+                PRIMARY KEY (url, content_hash)
+            );
+            CREATE TABLE IF NOT EXISTS issues (
+                url TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                section TEXT NOT NULL,
+                issue TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS issues_page ON issues (url, content_hash);
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                site TEXT NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS run_pages (
+                run_id INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                content_hash TEXT,
+                reused INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                PRIMARY KEY (run_id, url)
+            );
+        """, synchronous='NORMAL')
+
+    def cached(self, url, page_hash):
+        """Stored ``(results, terms)`` for this version of the page, or None.
+
+        ``terms`` is None when the page was audited without a ``SiteIndex``.
+        """
+        with self._lock:
+            row = self.conn.execute("SELECT results, terms FROM results WHERE url = ? AND content_hash = ?",
+                                    (url, page_hash)).fetchone()
+        if row is None:
+            return None
+        return unpack(row[0]), unpack(row[1])
+
+    def save(self, url, page_hash, results, terms=None):
+        """Store a page's results (and optionally its ``(terms, counts)``); error results are not stored"""
+        if "error" in results:
+            return
+        issues = PageFacts.from_results(url, results).issues
+        with self._lock:
+            self.conn.execute("DELETE FROM issues WHERE url = ? AND content_hash = ?", (url, page_hash))
+            self.conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                              (url, page_hash, pack(results), pack(terms) if terms is not None else None,
+                               time.time()))
+            self.conn.executemany("INSERT INTO issues VALUES (?, ?, ?, ?)",
+                                  ((url, page_hash, section, issue) for section, issue in issues))
+            self.conn.commit()
+
+    def start_run(self, site):
+        """Begin a new audit of ``site`` (e.g. its domain)"""
+        with self._lock:
+            cursor = self.conn.execute("INSERT INTO runs (site, started_at) VALUES (?, ?)", (site, time.time()))
+            self.conn.commit()
+        return AuditRun(self, cursor.lastrowid, site)
+
+    def add_run_page(self, run_id, url, page_hash, reused=False, error=None):
+        with self._lock:
+            self.conn.execute("INSERT OR REPLACE INTO run_pages VALUES (?, ?, ?, ?, ?)",
+                              (run_id, url, page_hash, int(reused), error))
+            self.conn.commit()
+
+    def finish_run(self, run_id):
+        with self._lock:
+            self.conn.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (time.time(), run_id))
+            self.conn.commit()
+
+    def previous_run(self, run_id):
+        """Id of the latest finished run of the same site before ``run_id``, or None"""
+        with self._lock:
+            row = self.conn.execute("""
+                SELECT id FROM runs WHERE site = (SELECT site FROM runs WHERE id = ?)
+                AND id < ? AND finished_at IS NOT NULL ORDER BY id DESC LIMIT 1
+            """, (run_id, run_id)).fetchone()
+        return row[0] if row else None
+
+    def run_issues(self, run_id):
+        """``{url: {(section, issue)}}`` for the page versions seen by a run"""
+        with self._lock:
+            rows = self.conn.execute("""
+                SELECT run_pages.url, issues.section, issues.issue FROM run_pages
+                LEFT JOIN issues ON issues.url = run_pages.url AND issues.content_hash = run_pages.content_hash
+                WHERE run_pages.run_id = ? AND run_pages.error IS NULL
+            """, (run_id,)).fetchall()
+        pages = {}
+        for url, section, issue in rows:
+            found = pages.setdefault(url, set())
+            if issue is not None:
+                found.add((section, issue))
+        return pages
+
+    def run_hashes(self, run_id):
+        with self._lock:
+            return dict(self.conn.execute(
+                "SELECT url, content_hash FROM run_pages WHERE run_id = ? AND error IS NULL", (run_id,)))
+
+    def diff(self, run_id, previous_id=None):
+        """What changed between two runs (by default, this run and the one before it).
+
+        Returns ``new_issues`` and ``resolved_issues`` as ``{"url", "section",
+        "issue"}`` rows, plus ``new_pages``, ``removed_pages``, ``changed_pages``
+        (content hash differs) and the number of unchanged pages.
+        """
+        previous_id = previous_id or self.previous_run(run_id)
+        current = self.run_issues(run_id)
+        previous = self.run_issues(previous_id) if previous_id else {}
+        current_hashes = self.run_hashes(run_id)
+        previous_hashes = self.run_hashes(previous_id) if previous_id else {}
+
+        def issue_rows(pages, baseline, include_unmatched):
+            return [{"url": url, "section": section, "issue": issue}
+                    for url, issues in pages.items() if include_unmatched or url in baseline
+                    for section, issue in sorted(issues - baseline.get(url, set()))]
+
+        shared = current_hashes.keys() & previous_hashes.keys()
+        return {
+            "previous_run": previous_id,
+            # Issues on pages new since the previous run are new; those on removed pages are not resolved
+            "new_issues": issue_rows(current, previous, include_unmatched=previous_id is not None),
+            "resolved_issues": issue_rows(previous, current, include_unmatched=False),
+            "new_pages": sorted(current_hashes.keys() - previous_hashes.keys()),
+            "removed_pages": sorted(previous_hashes.keys() - current_hashes.keys()),
+            "changed_pages": sorted(url for url in shared if current_hashes[url] != previous_hashes[url]),
+            "unchanged_pages": sum(1 for url in shared if current_hashes[url] == previous_hashes[url]),
+        }
+
+    def close(self):
+        self.conn.close()
+
+class AuditRun:
+    """One audit of a site, recording which version of each page it saw"""
+
+    def __init__(self, store, run_id, site):
+        self.store = store
+        self.id = run_id
+        self.site = site
+        self.reused = 0
+
+    def lookup(self, url, page_hash, need_terms=False):
+        """Stored ``(results, terms)`` for an unchanged page, recording the reuse in this run, or None"""
+        cached = self.store.cached(url, page_hash)
+        if cached is None or (need_terms and cached[1] is None):
+            return None
+        self.record(url, page_hash, cached[0], reused=True)
+        return cached
+
+    def record(self, url, page_hash, results, terms=None, reused=False):
+        """Add a page to this run, storing freshly analyzed results"""
+        if not reused:
+            self.store.save(url, page_hash, results, terms)
+        self.store.add_run_page(self.id, url, page_hash, reused, results.get("error"))
+        self.reused += reused
+
+    def finish(self):
+        self.store.finish_run(self.id)
+
+    def diff(self, previous_id=None):
+        return self.store.diff(self.id, previous_id)
+
+_default_store = SharedDefault(AuditStore)
+
+def get_default_store():
+    """The process-wide audit database"""
+    return _default_store.get()
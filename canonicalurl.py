@@ -0,0 +1,36 @@
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+# Query parameters that track a visit without changing the page
+TRACKING_PARAMETERS = frozenset(['gclid', 'gbraid', 'wbraid', 'dclid', 'fbclid', 'msclkid', 'yclid', 'igshid',
+                                 'mc_cid', 'mc_eid', '_ga', '_gl', 'ref_src'])
+TRACKING_PREFIXES = ('utm_',)
+
+class UrlCanonicalizer:
+    """Rewrite crawled URLs so query-string variants of one page dedupe to the same URL.
+
+    Tracking parameters are always dropped, as are any listed in ``drop`` (e.g.
+    ``sort``, ``sessionid`` or ``print``). With ``keep``, only those parameters
+    survive, which collapses faceted navigation. Remaining parameters are
+    sorted, the scheme and host lowercased, and the fragment removed.
+    """
+
+    def __init__(self, drop=(), keep=None, drop_prefixes=TRACKING_PREFIXES, sort_query=True):
+        self.drop = TRACKING_PARAMETERS | {name.lower() for name in drop}
+        self.keep = None if keep is None else {name.lower() for name in keep}
+        self.drop_prefixes = tuple(prefix.lower() for prefix in drop_prefixes)
+        self.sort_query = sort_query
+
+    def keeps(self, name):
+        name = name.lower()
+        if self.keep is not None:
+            return name in self.keep
+        return name not in self.drop and not name.startswith(self.drop_prefixes)
+
+    def __call__(self, url):
+        parsed = urlparse(url)
+        params = [(name, value) for name, value in parse_qsl(parsed.query, keep_blank_values=True)
+                  if self.keeps(name)]
+        if self.sort_query:
+            params.sort()
+        return parsed._replace(scheme=parsed.scheme.lower(), netloc=parsed.netloc.lower(),
+                               query=urlencode(params), fragment='').geturl()
@@ -19,10 +19,18 @@ import matplotlib.pyplot as plt
 import plotly.express as px
 import google.generativeai as genai
 from dotenv import load_dotenv
-import serpapi
 from Crawler import crawl_website
+from canonicalurl import UrlCanonicalizer
+from neardup import NearDuplicateIndex
 from icp import ICPChatbot
-from seocheck import SEOAnalyzer
+from seocheck import SEOAnalyzer, format_page_weight, format_size, format_timing
+from siteaudit import SUMMARY_COLUMNS, audit_site, summarize_results
+from pagefacts import AuditTable
+from httpcache import CachedPages, get_default_cache
+from auditstore import content_hash, get_default_store
+from llmcache import make_model
+from trends import TrendsService
+from siteindex import SiteIndex
 
 # Configure API keys
 load_dotenv()
@@ -31,7 +39,10 @@ SERPAPI_API_KEY = os.getenv("SERPAPI_API_KEY", "e8ba07c3494f92a8c88f9a4c4a6fc702
 
 # Initialize APIs
 genai.configure(api_key=GEMINI_API_KEY)
-client = serpapi.Client(api_key=SERPAPI_API_KEY)
+trends_service = TrendsService(SERPAPI_API_KEY)
+
+# Paragraph columns shown in the site audit's readability heatmap
+READABILITY_HEATMAP_PARAGRAPHS = 30
 
 # Custom CSS for Astute AI theme
 def local_css(file_name):
@@ -96,6 +107,8 @@ def generate_seo_report(results):
 
     report.append(f"\nReadability Score: {sem['readability']['flesch_score']}")
     report.append(f"Readability Level: {sem['readability']['level']}")
+    report.append(f"Long Sentences: {sem['readability']['long_sentence_ratio']:.0%}")
+    report.append(f"Passive Voice Sentences: {sem['readability']['passive_voice_ratio']:.0%}")
 
     # Content Structure
     report.append("\n" + "-"*50)
@@ -107,12 +120,22 @@ def generate_seo_report(results):
     for word, count in list(content['word_frequencies'].items())[:10]:
         report.append(f"  - {word}: {count}")
 
+    # Performance
+    report.append("\n" + "-"*50)
+    report.append("PERFORMANCE")
+    report.append("-"*50)
+    perf = results['performance']
+    report.append(f"\nPage Load Time: {perf['load_time']} seconds")
+    report.extend(format_timing(perf.get('timing')))
+    report.extend(format_page_weight(perf.get('page_weight')))
+
     return "\n".join(report)
 
 def extract_keywords_with_gemini(content, business_description):
     """Use Gemini to extract relevant keywords based on content and business context"""
     try:
-        model = genai.GenerativeModel('gemini-1.5-flash')
+        # Unchanged prompts are answered from the shared on-disk response cache
+        model = make_model('gemini-1.5-flash')
         
         prompt = f"""
         Analyze the following website content and business description to extract the most relevant keywords:
@@ -155,25 +178,12 @@ def extract_keywords_with_gemini(content, business_description):
         st.error(f"Error extracting keywords: {str(e)}")
         return {"keywords": []}
 
-def get_serp_analytics(keyword):
-    """Get SERP analytics for a keyword using SERP API"""
-    try:
-        params = {
-            "engine": "google_trends",
-            "q": keyword,
-            "api_key": SERPAPI_API_KEY,
-            "data_type": "TIMESERIES"
-        }
-        results = client.search(params)
-        return {
-            "keyword": keyword,
-            "search_volume": results.get("search_parameters", {}).get("search_volume", 0),
-            "competition": results.get("competition", "Medium"),
-            "timeline_data": results.get("timeline_data", [])
-        }
-    except Exception as e:
-        st.error(f"Error getting SERP data: {str(e)}")
-        return None
+def get_serp_analytics(keywords):
+    """Get SERP trend analytics for many keywords concurrently (cached per keyword and day)"""
+    serp_results = trends_service.fetch_many(keywords)
+    for keyword, error in trends_service.errors.items():
+        st.error(f"Error getting SERP data for '{keyword}': {error}")
+    return [result for result in serp_results if result]
 
 def visualize_keyword_trends(keyword_data):
     """Create visualizations for keyword trends"""
@@ -204,7 +214,8 @@ def visualize_keyword_trends(keyword_data):
 def generate_insightq_report(icp_data, seo_report_text, keywords_data):
     """Generate an InsightQ report combining ICP data, SEO analysis, and keyword research"""
     try:
-        model = genai.GenerativeModel('gemini-1.5-flash')
+        # Unchanged prompts are answered from the shared on-disk response cache
+        model = make_model('gemini-1.5-flash')
         
         # Prepare keyword insights
         top_keywords = "\n".join([f"- {kw}" for kw in keywords_data.get('keywords', [])[:5]])
@@ -248,6 +259,16 @@ if "start_crawling" not in st.session_state:
 if "crawled_links" not in st.session_state:
     st.session_state.crawled_links = []
 
+if "crawled_pages" not in st.session_state:
+    st.session_state.crawled_pages = CachedPages(get_default_cache())
+
+if "site_audit" not in st.session_state:
+    st.session_state.site_audit = None
+if "site_index" not in st.session_state:
+    st.session_state.site_index = None
+if "audit_diff" not in st.session_state:
+    st.session_state.audit_diff = None
+
 if "selected_link" not in st.session_state:
     st.session_state.selected_link = None
 
@@ -346,12 +367,22 @@ if st.session_state.start_crawling:
         value=icp_url if icp_url else "",
         key="analysis_url"
     )
+    use_sitemap = st.checkbox("Seed the crawl from the site's sitemap.xml", value=False, key="use_sitemap")
+    skip_duplicates = st.checkbox("Skip near-duplicate pages and tracking parameters", value=True,
+                                  key="skip_duplicates")
 
     if st.button("Start Analysis", key="analyze_btn"):
         if url:
             with st.spinner("Crawling website..."):
-                crawled_links = crawl_website(url)
+                frontier_path = f"crawls/{urlparse(url).netloc}.sqlite"
+                # Crawled bodies stay in the on-disk HTTP cache; only their URLs are kept in the session
+                crawled_pages = CachedPages(get_default_cache())
+                crawled_links = crawl_website(url, workers=10, frontier_path=frontier_path,
+                                              use_sitemap=use_sitemap, on_page=crawled_pages.add,
+                                              dedupe=NearDuplicateIndex() if skip_duplicates else None,
+                                              canonicalize=UrlCanonicalizer() if skip_duplicates else None)
                 st.session_state.crawled_links = crawled_links
+                st.session_state.crawled_pages = crawled_pages
                 json_filename = "crawled_links.json"
                 with open(json_filename, "w") as f:
                     json.dump(crawled_links, f, indent=4)
@@ -385,9 +416,17 @@ if st.session_state.crawled_links:
         if st.session_state.selected_link:
             with st.spinner("Analyzing SEO... This may take a moment"):
                 try:
-                    analyzer = SEOAnalyzer(st.session_state.selected_link)
+                    # Reuse the page the crawler already downloaded instead of fetching it again
+                    crawled_page = st.session_state.crawled_pages.get(st.session_state.selected_link)
+                    if crawled_page is not None:
+                        analyzer = SEOAnalyzer.from_response(crawled_page, url=st.session_state.selected_link)
+                    else:
+                        analyzer = SEOAnalyzer(st.session_state.selected_link)
                     results = analyzer.analyze()
                     st.session_state.seo_results = results
+                    if analyzer.response is not None:
+                        get_default_store().save(st.session_state.selected_link, content_hash(analyzer.response),
+                                                 results)
                     
                     report_text = generate_seo_report(results)
                     st.session_state.report_text = report_text
@@ -408,6 +447,98 @@ if st.session_state.crawled_links:
         else:
             st.warning("Please select a link first")
 
+    if st.button("Audit Entire Site", key="site_audit_btn"):
+        links = st.session_state.crawled_links
+        progress = st.progress(0.0, "Auditing pages...")
+        table = st.empty()
+        site_results = AuditTable()
+        rows = []
+        site_index = SiteIndex()
+        # Pages unchanged since the last audit of this site reuse their stored results
+        audit_run = get_default_store().start_run(urlparse(links[0]).netloc)
+        try:
+            for url, page_results in audit_site(links, pages=st.session_state.crawled_pages, index=site_index,
+                                                run=audit_run):
+                site_results.add(url, page_results)
+                rows.append(summarize_results(url, page_results))
+                progress.progress(len(rows) / len(links), f"Audited {len(rows)} of {len(links)} pages")
+                table.dataframe(pd.DataFrame(rows), use_container_width=True)
+        except Exception as e:
+            st.error(f"Site audit failed after {len(rows)} of {len(links)} pages: {str(e)}")
+        else:
+            st.session_state.site_audit = site_results
+            st.session_state.site_index = site_index
+            st.session_state.audit_diff = audit_run.diff()
+            st.info(f"{audit_run.reused} unchanged pages reused results from the previous audit")
+
+    if st.session_state.site_audit:
+        with st.expander("Site Audit Results", expanded=True):
+            st.dataframe(st.session_state.site_audit.to_dataframe(SUMMARY_COLUMNS), use_container_width=True)
+
+            # Per-paragraph Flesch scores of every page, one row per page
+            paragraphs = READABILITY_HEATMAP_PARAGRAPHS
+            readable_pages = {url: page_results['semantics']['readability']['paragraph_scores'][:paragraphs]
+                              for url, page_results in st.session_state.site_audit.items()
+                              if "error" not in page_results}
+            if any(readable_pages.values()):
+                st.subheader("Readability by Paragraph")
+                heatmap = pd.DataFrame.from_dict(readable_pages, orient="index")
+                st.plotly_chart(
+                    px.imshow(heatmap, color_continuous_scale="RdYlGn", zmin=0, zmax=100, aspect="auto",
+                              labels={"x": "Paragraph", "y": "Page", "color": "Flesch Score"}),
+                    use_container_width=True
+                )
+
+    audit_diff = st.session_state.audit_diff
+    if audit_diff and audit_diff["previous_run"]:
+        with st.expander("Changes Since Last Audit"):
+            cols = st.columns(4)
+            cols[0].metric("New Issues", len(audit_diff["new_issues"]))
+            cols[1].metric("Resolved Issues", len(audit_diff["resolved_issues"]))
+            cols[2].metric("Changed Pages", len(audit_diff["changed_pages"]))
+            cols[3].metric("Unchanged Pages", audit_diff["unchanged_pages"])
+            if audit_diff["new_issues"]:
+                st.subheader("New Issues")
+                st.dataframe(pd.DataFrame(audit_diff["new_issues"]), use_container_width=True)
+            if audit_diff["resolved_issues"]:
+                st.subheader("Resolved Issues")
+                st.dataframe(pd.DataFrame(audit_diff["resolved_issues"]), use_container_width=True)
+            if audit_diff["new_pages"] or audit_diff["removed_pages"]:
+                st.write(f"**New Pages:** {len(audit_diff['new_pages'])}, "
+                         f"**Removed Pages:** {len(audit_diff['removed_pages'])}")
+
+    site_index = st.session_state.site_index
+    if site_index is not None and len(site_index):
+        with st.expander("Site Keyword Index"):
+            duplicate_titles = site_index.duplicate_titles()
+            duplicate_metas = site_index.duplicate_meta_descriptions()
+            st.write(f"**Duplicate Titles:** {len(duplicate_titles)}")
+            for title, urls in duplicate_titles.items():
+                st.write(f"- {title}: {', '.join(urls)}")
+            st.write(f"**Duplicate Meta Descriptions:** {len(duplicate_metas)}")
+            for meta, urls in duplicate_metas.items():
+                st.write(f"- {meta}: {', '.join(urls)}")
+
+            st.write("**Pages Competing for the Same Terms:**")
+            contested = site_index.cannibalization()
+            if contested:
+                st.dataframe(
+                    pd.DataFrame([{"Term": entry["term"], "Pages": entry["page_count"],
+                                   "URLs": ", ".join(url for url, _ in entry["pages"])}
+                                  for entry in contested]),
+                    use_container_width=True
+                )
+            else:
+                st.write("No competing pages found")
+
+            term = st.text_input("Find pages for a term", key="site_index_term")
+            if term:
+                matches = site_index.search(term)
+                if matches:
+                    st.dataframe(pd.DataFrame(matches, columns=["URL", "TF-IDF"]), use_container_width=True)
+                else:
+                    st.write("No pages contain this term")
+
 # Display Results
 if st.session_state.seo_analysis_done and st.session_state.seo_results:
     results = st.session_state.seo_results
@@ -438,15 +569,8 @@ if st.session_state.seo_analysis_done and st.session_state.seo_results:
                 keyword_data = extract_keywords_with_gemini(content, business_desc)
                 st.session_state.keyword_data = keyword_data
                 
-                # Get SERP analytics for top keywords
-                serp_results = []
-                for kw in keyword_data['keywords'][:3]:  # Limit to top 3 for demo
-                    serp_data = get_serp_analytics(kw)
-                    if serp_data:
-                        serp_data['keyword'] = kw
-                        serp_results.append(serp_data)
-                
-                st.session_state.serp_results = serp_results
+                # Get SERP analytics for every keyword, fetched concurrently
+                st.session_state.serp_results = get_serp_analytics(keyword_data['keywords'])
                 st.rerun()
                 
             except Exception as e:
@@ -549,6 +673,7 @@ if st.session_state.seo_analysis_done and st.session_state.seo_results:
         with col2:
             st.metric("Page Load Time", f"{results['performance']['load_time']}s")
             st.metric("HTTP/2 Support", "Yes" if results['technical']['http2_support'] else "No")
+            st.metric("HTTP/3 Support", "Yes" if results['technical']['http3_support'] else "No")
 
     with st.expander("On-Page SEO Analysis"):
         on_page = results['on_page']
@@ -609,9 +734,13 @@ if st.session_state.seo_analysis_done and st.session_state.seo_results:
             st.progress(kw['visibility']/100, f"{kw['keyword']} - {kw['count']}x ({kw['density']}%)")
         
         st.subheader("Readability")
-        cols = st.columns(2)
+        cols = st.columns(4)
         cols[0].metric("Flesch Score", sem['readability']['flesch_score'])
         cols[1].metric("Level", sem['readability']['level'])
+        cols[2].metric("Long Sentences", f"{sem['readability']['long_sentence_ratio']:.0%}")
+        cols[3].metric("Passive Voice", f"{sem['readability']['passive_voice_ratio']:.0%}")
+        if sem['readability']['paragraph_scores']:
+            st.bar_chart(pd.DataFrame({"Flesch Score": sem['readability']['paragraph_scores']}))
 
     with st.expander("Content Structure"):
         content = results['content']
@@ -627,6 +756,37 @@ if st.session_state.seo_analysis_done and st.session_state.seo_results:
         cols[0].metric("Articles", content['html5_elements']['article'])
         cols[1].metric("Sections", content['html5_elements']['section'])
         cols[2].metric("Asides", content['html5_elements']['aside'])
+
+    timing = results['performance'].get('timing')
+    if timing and "error" not in timing:
+        with st.expander("Network Timing"):
+            cols = st.columns(5)
+            cols[0].metric("DNS", f"{timing['dns_ms']} ms" if timing['dns_ms'] is not None else "n/a")
+            cols[1].metric("Connect", f"{timing['connect_ms']} ms" if timing['connect_ms'] is not None else "n/a")
+            cols[2].metric("TLS", f"{timing['tls_ms']} ms" if timing['tls_ms'] is not None else "n/a")
+            cols[3].metric("TTFB", f"{timing['ttfb_ms']} ms")
+            cols[4].metric("Download", f"{timing['download_ms']} ms")
+
+            cols = st.columns(3)
+            cols[0].metric("Transfer Size", format_size(timing['transfer_bytes']))
+            cols[1].metric("Compression", f"{timing['compression_ratio']}x" if timing['compression_ratio'] else "None")
+            cols[2].metric("Redirects", timing['redirect_count'])
+
+    weight = results['performance'].get('page_weight')
+    if weight:
+        with st.expander("Page Weight"):
+            cols = st.columns(4)
+            cols[0].metric("Resources", weight['resource_count'])
+            cols[1].metric("Transfer Size", format_size(weight['total_bytes']))
+            cols[2].metric("Uncompressed", format_size(weight['uncompressed_bytes']))
+            cols[3].metric("No Cache Lifetime", weight['uncacheable_count'])
+
+            if weight['largest']:
+                st.subheader("Largest Resources")
+                st.dataframe(pd.DataFrame(weight['largest']), use_container_width=True)
+
+            for issue in weight['issues']:
+                st.warning(issue)
     
     if st.session_state.icp_data:
         with st.expander("Personalized Recommendations", expanded=True):
@@ -0,0 +1,122 @@
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+
+from httpcache import fetch_streamed, resolve_cache
+from netprobe import probe_protocols
+from sqlitestore import SharedDefault, open_database
+
+DEFAULT_PROBE_PATH = os.path.join('.cache', 'domain_probes.sqlite')
+DEFAULT_PROBE_TTL = 3600
+# Entries cached without one of these keys predate a probe and are re-run
+PROBE_KEYS = ("sitemap_xml", "http2_support", "http3_support", "protocols")
+
+def probe_sitemap(site, cache=None, timeout=5):
+    """Whether ``/sitemap.xml`` answers 200 (only the status is needed, so the body is never read)"""
+    sitemap_url = f"{site}/sitemap.xml"
+    try:
+        if cache is not None:
+            response = cache.fetch(sitemap_url, timeout=timeout, accept=lambda response: False)
+        else:
+            response = fetch_streamed(sitemap_url, timeout=timeout, accept=lambda response: False)
+        return response.status_code == 200
+    except requests.exceptions.RequestException:
+        return False
+
+def probe_http2(url, timeout=10):
+    """Check if the server negotiates HTTP/2 via ALPN"""
+    return probe_protocols(url, timeout)["http2"]
+
+class DomainProbeCache:
+    """Domain-wide technical checks, run once per site (scheme + host) and reused for ``ttl`` seconds.
+
+    Results are memoized in memory and, with ``path`` set, in a SQLite file so
+    the worker processes of a site audit share them too. Concurrent callers for
+    the same site wait for a single probe instead of each running their own.
+    """
+
+    def __init__(self, path=DEFAULT_PROBE_PATH, ttl=DEFAULT_PROBE_TTL, cache=None):
+        self.ttl = ttl
+        self.cache = resolve_cache(cache)
+        self.sites = {}
+        self._lock = threading.Lock()
+        self._site_locks = {}
+        self.conn = None
+
+        if path:
+            self.conn = open_database(path, """
+                CREATE TABLE IF NOT EXISTS probes (
+                    site TEXT PRIMARY KEY,
+                    results TEXT,
+                    probed_at REAL
+                )
+            """)
+
+    def site_key(self, url):
+        parsed_url = urlparse(url)
+        return f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+    def run_probes(self, site):
+        protocols = probe_protocols(site)
+        return {
+            "sitemap_xml": probe_sitemap(site, self.cache),
+            "http2_support": protocols["http2"],
+            "http3_support": protocols["http3"],
+            "protocols": protocols,
+        }
+
+    def lookup(self, site):
+        """Unexpired results for a site from memory or disk, or None"""
+        with self._lock:
+            entry = self.sites.get(site)
+            if entry is None and self.conn is not None:
+                row = self.conn.execute("SELECT results, probed_at FROM probes WHERE site = ?", (site,)).fetchone()
+                if row:
+                    entry = self.sites[site] = (json.loads(row[0]), row[1])
+        if entry is not None and time.time() - entry[1] <= self.ttl and all(key in entry[0] for key in PROBE_KEYS):
+            return entry[0]
+        return None
+
+    def save(self, site, results):
+        probed_at = time.time()
+        with self._lock:
+            self.sites[site] = (results, probed_at)
+            if self.conn is not None:
+                self.conn.execute("INSERT OR REPLACE INTO probes VALUES (?, ?, ?)",
+                                  (site, json.dumps(results), probed_at))
+                self.conn.commit()
+
+    def probe(self, url):
+        """The probe results for the URL's site: sitemap.xml presence, HTTP/2 and HTTP/3 support and
+        the ``netprobe.probe_protocols`` details (ALPN, Alt-Svc, TLS handshake time)"""
+        site = self.site_key(url)
+        results = self.lookup(site)
+        if results is not None:
+            return results
+
+        with self._lock:
+            site_lock = self._site_locks.setdefault(site, threading.Lock())
+        with site_lock:
+            # Another thread may have finished the probe while we waited
+            results = self.lookup(site)
+            if results is None:
+                results = self.run_probes(site)
+                self.save(site, results)
+        return results
+
+    def clear(self):
+        with self._lock:
+            self.sites.clear()
+            if self.conn is not None:
+                self.conn.execute("DELETE FROM probes")
+                self.conn.commit()
+
+_default_probes = SharedDefault(DomainProbeCache)
+
+def get_default_probes():
+    """The shared domain probe cache used by every ``SEOAnalyzer``"""
+    return _default_probes.get()
@@ -0,0 +1,131 @@
+import re
+
+from bs4 import CData, NavigableString, Tag
+
+# Only these string types count as visible text (script/style/template contents and comments do not)
+TEXT_STRING_TYPES = (NavigableString, CData)
+
+SEMANTIC_TAGS = ('p', 'strong', 'em', 'ul', 'ol', 'blockquote')
+HTML5_TAGS = ('header', 'footer', 'nav', 'article', 'section', 'aside')
+HEADING_TAGS = ('h1', 'h2', 'h3')
+
+OG_PROPERTY = re.compile("^og:")
+TWITTER_NAME = re.compile("^twitter:")
+
+class DomFacts:
+    """Everything the analyzer needs from a parsed page, gathered in one tree walk"""
+
+    __slots__ = (
+        'title_tag', 'meta_description', 'meta_robots', 'meta_viewport', 'canonical',
+        'og_tag_count', 'twitter_tag_count', 'anchors', 'images', 'headings',
+        'tag_counts', 'inline_scripts', 'external_scripts', 'text_parts',
+        'script_sources', 'stylesheets', 'font_links', 'style_texts', 'first_paragraph', 'paragraphs',
+    )
+
+    def __init__(self):
+        self.title_tag = None
+        self.meta_description = None
+        self.meta_robots = None
+        self.meta_viewport = None
+        self.canonical = None
+        self.og_tag_count = 0
+        self.twitter_tag_count = 0
+        self.anchors = []
+        self.images = []
+        self.headings = {tag: [] for tag in HEADING_TAGS}
+        self.tag_counts = dict.fromkeys(SEMANTIC_TAGS + HTML5_TAGS + ('style', 'frame', 'iframe'), 0)
+        self.inline_scripts = 0
+        self.external_scripts = 0
+        self.text_parts = []
+        # Subresources, for the page weight stage
+        self.script_sources = []
+        self.stylesheets = []
+        self.font_links = []
+        self.style_texts = []
+        # Text of the first non-empty <p>, for keyword placement
+        self.first_paragraph = None
+        # Text of every non-empty <p>, for per-paragraph readability
+        self.paragraphs = []
+
+    @property
+    def title(self):
+        return self.title_tag.string if self.title_tag else ""
+
+    @property
+    def text(self):
+        """Visible text, equivalent to ``soup.get_text(separator=" ", strip=True)``"""
+        return " ".join(self.text_parts)
+
+    def count(self, tag):
+        return self.tag_counts.get(tag, 0)
+
+    def heading_texts(self, tag):
+        return [heading.text.strip() for heading in self.headings[tag]]
+
+def collect_dom_facts(soup):
+    """Walk the soup once and record tag counts, the attributes and elements the analysis reads, and the visible text"""
+    facts = DomFacts()
+    tag_counts = facts.tag_counts
+    headings = facts.headings
+    text_parts = facts.text_parts
+
+    for node in soup.descendants:
+        if not isinstance(node, Tag):
+            if type(node) in TEXT_STRING_TYPES:
+                text = node.strip()
+                if text:
+                    text_parts.append(text)
+            continue
+
+        name = node.name
+        if name in tag_counts:
+            tag_counts[name] += 1
+            if name == 'style':
+                facts.style_texts.append(node.get_text())
+            elif name == 'p':
+                paragraph = node.get_text(" ", strip=True)
+                if paragraph:
+                    facts.paragraphs.append(paragraph)
+                    if facts.first_paragraph is None:
+                        facts.first_paragraph = paragraph
+        elif name in headings:
+            headings[name].append(node)
+        elif name == 'a':
+            if node.get('href') is not None:
+                facts.anchors.append(node)
+        elif name == 'img':
+            facts.images.append(node)
+        elif name == 'script':
+            if node.get('src'):
+                facts.external_scripts += 1
+                facts.script_sources.append(node['src'])
+            else:
+                facts.inline_scripts += 1
+        elif name == 'meta':
+            meta_name = node.get('name')
+            if meta_name is not None:
+                if meta_name == 'description' and facts.meta_description is None:
+                    facts.meta_description = node
+                elif meta_name == 'robots' and facts.meta_robots is None:
+                    facts.meta_robots = node
+                elif meta_name == 'viewport' and facts.meta_viewport is None:
+                    facts.meta_viewport = node
+                elif TWITTER_NAME.search(meta_name):
+                    facts.twitter_tag_count += 1
+            meta_property = node.get('property')
+            if meta_property is not None and OG_PROPERTY.search(meta_property):
+                facts.og_tag_count += 1
+        elif name == 'link':
+            rel = node.get('rel')
+            rels = rel if isinstance(rel, list) else [rel]
+            if facts.canonical is None and 'canonical' in rels:
+                facts.canonical = node
+            elif 'stylesheet' in rels and node.get('href'):
+                facts.stylesheets.append(node['href'])
+            elif 'preload' in rels and node.get('as') == 'font' and node.get('href'):
+                facts.font_links.append(node['href'])
+        elif name == 'title':
+            if facts.title_tag is None:
+                facts.title_tag = node
+
+    return facts
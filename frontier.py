@@ -0,0 +1,130 @@
+import os
+import sqlite3
+import time
+
+QUEUED = 'queued'
+DONE = 'done'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+ERROR = 'error'
+# Fetched, but a near copy of an earlier page (see ``neardup``)
+DUPLICATE = 'duplicate'
+
+class CrawlFrontier:
+    """On-disk crawl frontier so an interrupted crawl can be resumed.
+
+    Every discovered URL is stored with its discovery sequence number and fetch
+    status. Pending URLs (queued, or failed with a transient error) come back in
+    BFS order on resume; pages already fetched are never requested again.
+    Writes are checkpointed every ``checkpoint_every`` updates.
+    """
+
+    def __init__(self, path, checkpoint_every=50):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.checkpoint_every = checkpoint_every
+        self._dirty = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS urls (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT UNIQUE NOT NULL,
+                status TEXT NOT NULL,
+                http_status INTEGER,
+                updated_at REAL
+            )
+        """)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.commit()
+
+    def start(self, main_url):
+        """Begin a crawl, resuming an unfinished one for the same start URL"""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'main_url'").fetchone()
+        if row is None or row[0] != main_url or self.is_finished():
+            self.reset()
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('main_url', ?)", (main_url,))
+            self.add(main_url)
+            self.conn.commit()
+            return False
+        return True
+
+    def reset(self):
+        """Forget all stored URLs"""
+        self.conn.execute("DELETE FROM urls")
+        self.conn.execute("DELETE FROM meta")
+        self.conn.commit()
+
+    def add(self, url):
+        """Queue a newly discovered URL; returns False if it was already known"""
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO urls (url, status, updated_at) VALUES (?, ?, ?)",
+            (url, QUEUED, time.time())
+        )
+        self._touch()
+        return cursor.rowcount > 0
+
+    def add_many(self, urls):
+        """Queue a batch of URLs in one transaction; returns how many were new"""
+        before = self.conn.total_changes
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO urls (url, status, updated_at) VALUES (?, ?, ?)",
+            ((url, QUEUED, now) for url in urls)
+        )
+        self.checkpoint()
+        return self.conn.total_changes - before
+
+    def mark(self, url, status, http_status=None):
+        """Record the fetch outcome for a URL"""
+        self.conn.execute(
+            "UPDATE urls SET status = ?, http_status = ?, updated_at = ? WHERE url = ?",
+            (status, http_status, time.time(), url)
+        )
+        self._touch()
+
+    def mark_error(self, url, http_status=None):
+        """Record a failed fetch; network errors, 429 and 5xx are retried on resume"""
+        transient = http_status is None or http_status == 429 or http_status >= 500
+        self.mark(url, FAILED if transient else ERROR, http_status)
+
+    def links(self):
+        """All known URLs in discovery order"""
+        return [row[0] for row in self.conn.execute("SELECT url FROM urls ORDER BY seq")]
+
+    def pending(self):
+        """URLs still to be fetched, in discovery order"""
+        return [row[0] for row in self.conn.execute(
+            "SELECT url FROM urls WHERE status IN (?, ?) ORDER BY seq", (QUEUED, FAILED)
+        )]
+
+    def with_status(self, status):
+        """URLs with the given fetch status, in discovery order"""
+        return [row[0] for row in self.conn.execute(
+            "SELECT url FROM urls WHERE status = ? ORDER BY seq", (status,)
+        )]
+
+    def finish(self):
+        """Mark the crawl complete so the next ``start`` begins a fresh crawl"""
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('finished', '1')")
+        self.checkpoint()
+
+    def is_finished(self):
+        return self.conn.execute("SELECT 1 FROM meta WHERE key = 'finished'").fetchone() is not None
+
+    def checkpoint(self):
+        self.conn.commit()
+        self._dirty = 0
+
+    def close(self):
+        self.checkpoint()
+        self.conn.close()
+
+    def _touch(self):
+        self._dirty += 1
+        if self._dirty >= self.checkpoint_every:
+            self.checkpoint()
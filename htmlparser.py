@@ -0,0 +1,103 @@
+import importlib
+import json
+import os
+import sys
+
+from bs4 import BeautifulSoup
+
+# Fastest first; 'html.parser' is pure Python and always available
+PARSER_BACKENDS = ('lxml', 'html5-parser', 'html.parser')
+BACKEND_MODULES = {'lxml': 'lxml', 'html5-parser': 'html5_parser', 'html.parser': None}
+
+_availability = {}
+
+def is_available(backend):
+    """Whether the backend's module imports cleanly (html5-parser, for one, refuses to load against a mismatched lxml)"""
+    if backend not in _availability:
+        module = BACKEND_MODULES.get(backend)
+        if module is None:
+            _availability[backend] = backend == 'html.parser'
+        else:
+            try:
+                importlib.import_module(module)
+                _availability[backend] = True
+            except Exception:
+                _availability[backend] = False
+    return _availability[backend]
+
+def available_backends():
+    return [backend for backend in PARSER_BACKENDS if is_available(backend)]
+
+def resolve_backend(backend=None):
+    """Pick the parser backend: explicit argument, then $ASTUTE_HTML_PARSER, then 'html.parser'.
+
+    'auto' selects the fastest installed backend. Results match 'html.parser'
+    (see test_htmlparser.py) except on markup that leaves headings or paragraphs
+    unclosed, which fast backends close implicitly as browsers do; check
+    ``compare_backends`` on representative pages before switching.
+    """
+    backend = backend or os.environ.get('ASTUTE_HTML_PARSER', 'html.parser')
+    if backend == 'auto':
+        return available_backends()[0]
+    if backend not in BACKEND_MODULES:
+        raise ValueError(f"Unknown HTML parser backend '{backend}', expected one of {PARSER_BACKENDS}")
+    if not is_available(backend):
+        return 'html.parser'
+    return backend
+
+def make_soup(markup, backend=None):
+    """Parse HTML into a BeautifulSoup tree with the chosen backend"""
+    backend = resolve_backend(backend)
+    if backend == 'html5-parser':
+        from html5_parser import parse
+        return parse(markup, treebuilder='soup', return_root=False)
+    return BeautifulSoup(markup, backend)
+
+def dom_summary(facts):
+    """DOM-derived technical fields, for comparing backends without any network probes"""
+    return {
+        "canonical": facts.canonical.get("href") if facts.canonical else None,
+        "robots_meta": facts.meta_robots.get("content") if facts.meta_robots else None,
+        "viewport": facts.meta_viewport is not None,
+        "og_tags": facts.og_tag_count,
+        "twitter_tags": facts.twitter_tag_count,
+        "inline_scripts": facts.inline_scripts,
+        "external_scripts": facts.external_scripts,
+        "tag_counts": facts.tag_counts,
+    }
+
+def compare_backends(markup, url, backends=None):
+    """Parity check: analyze the same HTML with each backend and report sections that differ.
+
+    Only the offline parts of the analysis run (on-page, semantics, content and the
+    DOM-derived technical fields). Returns ``{backend: [differing sections]}``
+    relative to the pure-Python 'html.parser' backend.
+    """
+    from httpcache import CachedResponse
+    from seocheck import SEOAnalyzer
+
+    body = markup.encode('utf-8') if isinstance(markup, str) else markup
+    response = CachedResponse(url, 200, {'Content-Type': 'text/html'}, body)
+
+    def analyze(backend):
+        analyzer = SEOAnalyzer.from_response(response, url=url, cache=False, parser=backend)
+        analyzer.fetch_page()
+        analyzer.analyze_on_page_factors()
+        analyzer.analyze_semantics()
+        analyzer.analyze_text_content()
+        sections = {key: analyzer.results[key] for key in ("on_page", "semantics", "content")}
+        sections["dom"] = dom_summary(analyzer.facts)
+        return sections
+
+    reference = analyze('html.parser')
+    report = {}
+    for backend in backends or available_backends():
+        sections = analyze(backend)
+        report[backend] = [key for key in reference if sections[key] != reference[key]]
+    return report
+
+if __name__ == "__main__":
+    # Usage: python htmlparser.py page.html [page2.html ...]
+    for path in sys.argv[1:]:
+        with open(path, 'rb') as f:
+            print(path, json.dumps(compare_backends(f.read(), f"https://example.com/{os.path.basename(path)}")))
@@ -0,0 +1,307 @@
+import codecs
+import json
+import os
+import threading
+import time
+import zlib
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from sqlitestore import SharedDefault, open_database
+
+DEFAULT_CACHE_PATH = os.path.join('.cache', 'http_cache.sqlite')
+DEFAULT_FRESH_FOR = 600
+DEFAULT_MAX_BODY_BYTES = 10 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+SNIFF_BYTES = 1024
+
+class CachedResponse:
+    """Minimal stand-in for ``requests.Response`` that can be served from the cache"""
+
+    def __init__(self, url, status_code, headers, content, encoding=None, elapsed=0.0, from_cache=False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.content = content
+        self.encoding = encoding or 'utf-8'
+        self.elapsed = elapsed
+        self.from_cache = from_cache
+        # Network timing breakdown of the download, from ``netprobe.timed_fetch`` or a traced crawl
+        self.timing = None
+        self._text = None
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = self.content.decode(self.encoding, errors='replace')
+        return self._text
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def close(self):
+        pass
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+class BodyRejected(requests.exceptions.RequestException):
+    """A response body was abandoned mid-stream: over the size limit, or binary behind an HTML content type"""
+
+class BodyReader:
+    """Collect a streamed response body under a size cap, decoding it to text chunk by chunk.
+
+    At most ``max_bytes`` of body (plus its decoded text) is ever held, and the
+    download stops as soon as the limit is crossed, so memory per in-flight
+    page stays bounded whatever the server sends.
+    """
+
+    def __init__(self, url, encoding=None, max_bytes=DEFAULT_MAX_BODY_BYTES, content_length=None):
+        self.url = url
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.chunks = []
+        self.text_parts = []
+        self.encoding = encoding or 'utf-8'
+        try:
+            self.decoder = codecs.getincrementaldecoder(self.encoding)(errors='replace')
+        except LookupError:
+            self.encoding = 'utf-8'
+            self.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+        # Refuse up front when the server announces an oversized body
+        if content_length and content_length.isdigit() and max_bytes and int(content_length) > max_bytes:
+            raise BodyRejected(f"{url} is {content_length} bytes, over the {max_bytes} byte limit")
+
+    def feed(self, chunk):
+        if not chunk:
+            return
+        if not self.size and b'\x00' in chunk[:SNIFF_BYTES]:
+            raise BodyRejected(f"{self.url} looks like binary content")
+        self.size += len(chunk)
+        if self.max_bytes and self.size > self.max_bytes:
+            raise BodyRejected(f"{self.url} exceeds the {self.max_bytes} byte limit")
+        self.chunks.append(chunk)
+        self.text_parts.append(self.decoder.decode(chunk))
+
+    def response(self, status_code, headers, elapsed=0.0, url=None):
+        """The finished body as a ``CachedResponse`` with its text already decoded"""
+        self.text_parts.append(self.decoder.decode(b'', final=True))
+        result = CachedResponse(url or self.url, status_code, headers, b''.join(self.chunks),
+                                self.encoding, elapsed)
+        result._text = ''.join(self.text_parts)
+        return result
+
+def fetch_streamed(url, session=None, headers=None, timeout=10, accept=None,
+                   max_bytes=DEFAULT_MAX_BODY_BYTES):
+    """GET a URL with a streamed, size-capped body, returning a ``CachedResponse``.
+
+    ``accept(response)`` can reject a 200 response from its headers alone, in
+    which case the body is not downloaded and an empty one is returned. A body
+    over ``max_bytes`` (or one whose first bytes are binary) raises ``BodyRejected``.
+    """
+    session = session or requests
+    start_time = time.time()
+    response = session.get(url, headers=headers, timeout=timeout, stream=True)
+
+    with response:
+        if accept is not None and response.status_code == 200 and not accept(response):
+            return CachedResponse(response.url, response.status_code, dict(response.headers), b'',
+                                  response.encoding, time.time() - start_time)
+
+        reader = BodyReader(response.url, response.encoding, max_bytes,
+                            response.headers.get('Content-Length'))
+        for chunk in response.iter_content(CHUNK_SIZE):
+            reader.feed(chunk)
+
+    return reader.response(response.status_code, dict(response.headers), time.time() - start_time)
+
+def parse_http_date(value):
+    """Seconds since the epoch for an HTTP date header, or None if it is missing or invalid"""
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+def freshness_lifetime(headers, default, fetched_at):
+    """How many seconds a stored response may be served without revalidation.
+
+    ``no-cache``/``no-store`` (or ``Pragma: no-cache``) mean 0, then
+    ``Cache-Control: max-age`` wins over ``Expires`` (measured from ``Date``,
+    or from ``fetched_at``); responses with neither are fresh for ``default``.
+    """
+    directives = {}
+    for directive in headers.get('Cache-Control', '').lower().split(','):
+        name, _, value = directive.strip().partition('=')
+        if name:
+            directives[name] = value.strip().strip('"')
+    if 'no-cache' in directives or 'no-store' in directives:
+        return 0
+    if not directives and 'no-cache' in headers.get('Pragma', '').lower():
+        return 0
+    if 'max-age' in directives:
+        return int(directives['max-age']) if directives['max-age'].isdigit() else 0
+
+    if 'Expires' in headers:
+        expires = parse_http_date(headers['Expires'])
+        if expires is None:
+            # An invalid Expires (commonly "0") means already expired
+            return 0
+        date = parse_http_date(headers.get('Date')) or fetched_at
+        return max(0, expires - date)
+    return default
+
+class HTTPCache:
+    """On-disk HTTP response cache with conditional revalidation.
+
+    Responses are stored with their body, headers, ETag and Last-Modified.
+    Entries still fresh by their Cache-Control / Expires headers (or, without
+    either, younger than ``fresh_for`` seconds) are served with no network
+    round trip at all; others are revalidated with If-None-Match /
+    If-Modified-Since, so an unchanged page costs a single 304.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, fresh_for=DEFAULT_FRESH_FOR, max_body_bytes=DEFAULT_MAX_BODY_BYTES):
+        self.path = path
+        self.fresh_for = fresh_for
+        self.max_body_bytes = max_body_bytes
+        self._lock = threading.Lock()
+        self.conn = open_database(path, """
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                final_url TEXT,
+                status INTEGER,
+                headers TEXT,
+                body BLOB,
+                encoding TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                elapsed REAL,
+                fetched_at REAL,
+                timing TEXT
+            )
+        """)
+        # Caches created before timings were stored
+        if 'timing' not in {row[1] for row in self.conn.execute("PRAGMA table_info(responses)")}:
+            self.conn.execute("ALTER TABLE responses ADD COLUMN timing TEXT")
+            self.conn.commit()
+
+    def get(self, url):
+        """Return the stored response for a URL and its age in seconds, or (None, None)"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT final_url, status, headers, body, encoding, elapsed, fetched_at, timing FROM responses "
+                "WHERE url = ?",
+                (url,)
+            ).fetchone()
+        if row is None:
+            return None, None
+
+        final_url, status, headers, body, encoding, elapsed, fetched_at, timing = row
+        response = CachedResponse(final_url, status, json.loads(headers), zlib.decompress(body),
+                                  encoding, elapsed, from_cache=True)
+        response.timing = json.loads(timing) if timing else None
+        return response, time.time() - fetched_at
+
+    def store(self, url, response):
+        """Save a successful response unless the server forbids storing it"""
+        if response.status_code != 200 or 'no-store' in response.headers.get('Cache-Control', '').lower():
+            return
+
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (url, final_url, status, headers, body, encoding, etag, "
+                "last_modified, elapsed, fetched_at, timing) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, response.url, response.status_code, json.dumps(dict(response.headers)),
+                 zlib.compress(response.content), response.encoding,
+                 response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                 response.elapsed, time.time(), json.dumps(getattr(response, 'timing', None)))
+            )
+            self.conn.commit()
+
+    def touch(self, url):
+        """Mark a cached entry as freshly revalidated"""
+        with self._lock:
+            self.conn.execute("UPDATE responses SET fetched_at = ? WHERE url = ?", (time.time(), url))
+            self.conn.commit()
+
+    def conditional_headers(self, url, headers=None):
+        """Request headers with validators for the cached copy of the URL, if any"""
+        headers = dict(headers or {})
+        with self._lock:
+            row = self.conn.execute("SELECT etag, last_modified FROM responses WHERE url = ?", (url,)).fetchone()
+        if row:
+            etag, last_modified = row
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def is_fresh(self, age, response):
+        """Whether a stored ``response`` of this age can be served without revalidation"""
+        if age is None:
+            return False
+        return age < freshness_lifetime(response.headers, self.fresh_for, time.time() - age)
+
+    def fetch(self, url, session=None, headers=None, timeout=10, accept=None):
+        """GET a URL through the cache, returning a ``CachedResponse``.
+
+        Bodies are streamed and capped at ``max_body_bytes`` (see ``fetch_streamed``).
+        """
+        cached, age = self.get(url)
+        if cached is not None and self.is_fresh(age, cached):
+            return cached
+
+        request_headers = self.conditional_headers(url, headers) if cached is not None else headers
+        result = fetch_streamed(url, session, request_headers, timeout, accept, self.max_body_bytes)
+
+        if result.status_code == 304 and cached is not None:
+            self.touch(url)
+            return cached
+
+        if result.content:
+            self.store(url, result)
+        return result
+
+class CachedPages:
+    """Read-only ``{url: CachedResponse}`` view of pages whose bodies are stored in an ``HTTPCache``.
+
+    Only the URLs are held in memory; each body is loaded from the cache when
+    asked for, whatever its age. ``get`` returns None for URLs that are not in
+    the set or were never stored (e.g. ``no-store`` responses).
+    """
+
+    def __init__(self, cache, urls=()):
+        self.cache = cache
+        self.urls = set(urls)
+
+    def add(self, url, response=None):
+        """Record a stored page; usable as ``crawl_website(on_page=...)``"""
+        self.urls.add(url)
+
+    def get(self, url, default=None):
+        if url not in self.urls or self.cache is None:
+            return default
+        cached, age = self.cache.get(url)
+        return cached if cached is not None else default
+
+    def __contains__(self, url):
+        return url in self.urls
+
+    def __len__(self):
+        return len(self.urls)
+
+_default_cache = SharedDefault(HTTPCache)
+
+def get_default_cache():
+    """The process-wide shared cache used by the crawler and the analyzer"""
+    return _default_cache.get()
+
+def resolve_cache(cache):
+    """Map a ``cache`` argument to a cache: None means the shared cache, False disables caching"""
+    return _default_cache.resolve(cache)
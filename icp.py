@@ -7,6 +7,8 @@ import google.generativeai as genai
 from typing import Dict, Any, List
 import re
 
+from llmcache import make_model
+
 # Set page configuration at the very beginning
 st.set_page_config(
     page_title="ICP Chatbot",
@@ -252,7 +254,8 @@ class ICPChatbot:
         self.model = None
         if api_key:
             try:
-                self.model = genai.GenerativeModel('gemini-pro')
+                # Shares the app's response cache, so repeated evaluations don't call Gemini again
+                self.model = make_model('gemini-pro')
             except Exception as e:
                 st.error(f"Error initializing Gemini model: {e}")
                 
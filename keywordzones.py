@@ -0,0 +1,65 @@
+import re
+from urllib.parse import unquote, urlparse
+
+from ngrams import tokenize
+
+# Where a keyword can appear, the points each placement adds to its visibility
+# score, and the label shown in reports. Zones total 85; density adds up to 15.
+ZONES = (
+    ("title", 25, "Title"),
+    ("h1", 15, "H1"),
+    ("headings", 10, "H2/H3 Headings"),
+    ("meta_description", 10, "Meta Description"),
+    ("first_paragraph", 10, "First Paragraph"),
+    ("url", 10, "URL"),
+    ("alt_text", 5, "Image Alt Text"),
+)
+ZONE_WEIGHTS = {name: weight for name, weight, label in ZONES}
+ZONE_LABELS = {name: label for name, weight, label in ZONES}
+DENSITY_WEIGHT = 10
+MAX_DENSITY_POINTS = 15
+
+SLUG_SEPARATORS = re.compile(r'[^a-zA-Z]+')
+
+def slug_tokens(url):
+    """Words of three letters or more in a URL path, in order ('/blog/seo_tips-2024' -> blog, seo, tips)"""
+    path = unquote(urlparse(url).path)
+    return [word.lower() for word in SLUG_SEPARATORS.split(path) if len(word) >= 3]
+
+class KeywordZoneIndex:
+    """Token sets for each placement zone of a page, built once per analysis.
+
+    Keywords are matched as whole tokens (the same tokenizer as the keyword
+    counts), so "art" does not match "start"; each zone lookup is one set probe.
+    """
+
+    __slots__ = ('zones',)
+
+    def __init__(self, zones):
+        self.zones = zones
+
+    @classmethod
+    def from_facts(cls, facts, url):
+        headings = [text for tag in ("h2", "h3") for text in facts.heading_texts(tag)]
+        meta_description = facts.meta_description.get("content") if facts.meta_description else None
+        alt_texts = [image.get("alt") for image in facts.images if image.get("alt")]
+
+        return cls({
+            "title": frozenset(tokenize(facts.title or "")),
+            "h1": frozenset(tokenize(" ".join(facts.heading_texts("h1")))),
+            "headings": frozenset(tokenize(" ".join(headings))),
+            "meta_description": frozenset(tokenize(meta_description or "")),
+            "first_paragraph": frozenset(tokenize(facts.first_paragraph or "")),
+            "url": frozenset(slug_tokens(url)),
+            "alt_text": frozenset(tokenize(" ".join(alt_texts))),
+        })
+
+    def zones_for(self, keyword):
+        """Names of the zones the keyword appears in, in ``ZONES`` order"""
+        return [name for name, weight, label in ZONES if keyword in self.zones[name]]
+
+    def visibility(self, keyword, density, zones=None):
+        """Weighted 0-100 score: placement points plus keyword density (10 points per 1%, up to 15)"""
+        zones = self.zones_for(keyword) if zones is None else zones
+        score = sum(ZONE_WEIGHTS[zone] for zone in zones)
+        return min(100, score + min(density * DENSITY_WEIGHT, MAX_DENSITY_POINTS))
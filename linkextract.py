@@ -0,0 +1,60 @@
+import html
+import re
+from urllib.parse import urljoin
+
+# One scan over the raw bytes: comments and script/style bodies are matched (and
+# skipped) so links inside them are ignored; <a> and <base> start tags are captured.
+TOKEN_PATTERN = re.compile(
+    rb'<!--.*?-->'
+    rb'|<(script|style)\b[^>]*>.*?</\1\s*>'
+    rb'|<(a|base)\b((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>',
+    re.IGNORECASE | re.DOTALL
+)
+ATTRIBUTE_PATTERN = re.compile(
+    rb'([^\s=/>"\']+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>"\']+)))?'
+)
+
+def tag_attribute(attributes, wanted):
+    """Value of the first attribute named ``wanted`` in a start tag's attribute bytes, or None"""
+    for match in ATTRIBUTE_PATTERN.finditer(attributes):
+        if match.group(1).lower() == wanted:
+            value = match.group(2)
+            if value is None:
+                value = match.group(3)
+            if value is None:
+                value = match.group(4)
+            return value if value is not None else b''
+    return None
+
+def iter_hrefs(body, encoding='utf-8'):
+    """Yield ``(tag, href)`` for every <a href> and <base href> in raw HTML bytes, in document order.
+
+    No DOM is built: a single regex tokenizer pass finds the start tags.
+    """
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+        encoding = 'utf-8'
+
+    for match in TOKEN_PATTERN.finditer(body):
+        tag = match.group(2)
+        if tag is None:
+            continue
+
+        value = tag_attribute(match.group(3), b'href')
+        if value is None:
+            continue
+
+        yield tag.lower().decode('ascii'), html.unescape(value.decode(encoding, errors='replace'))
+
+def iter_page_links(body, page_url, encoding='utf-8'):
+    """Yield absolute link URLs from raw HTML, resolved against the page's <base href> when present"""
+    base_url = page_url
+    seen_base = False
+
+    for tag, href in iter_hrefs(body, encoding):
+        if tag == 'base':
+            if not seen_base:
+                seen_base = True
+                base_url = urljoin(page_url, href.strip())
+            continue
+        yield urljoin(base_url, href)
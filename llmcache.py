@@ -0,0 +1,170 @@
+import hashlib
+import os
+import threading
+import time
+
+from sqlitestore import SharedDefault, open_database
+
+DEFAULT_LLM_CACHE_PATH = os.path.join('.cache', 'llm_cache.sqlite')
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+def normalize_prompt(prompt):
+    """Collapse whitespace so re-indented or re-wrapped copies of a prompt share a cache entry"""
+    return " ".join(prompt.split())
+
+def prompt_key(model_name, prompt):
+    return hashlib.sha256(f"{model_name}\x00{normalize_prompt(prompt)}".encode('utf-8')).hexdigest()
+
+class LLMCache:
+    """On-disk cache of LLM responses keyed by model name and normalized prompt hash.
+
+    Entries older than ``ttl`` seconds are ignored and dropped. Once the stored
+    text exceeds ``max_bytes``, or there are more than ``max_entries`` entries
+    (if set), the least recently used entries are evicted.
+    """
+
+    def __init__(self, path=DEFAULT_LLM_CACHE_PATH, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES, max_entries=None):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.conn = open_database(path, """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                text TEXT,
+                size INTEGER,
+                created_at REAL,
+                used_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS responses_used ON responses (used_at);
+        """)
+
+    def get(self, model_name, prompt):
+        """The cached response text for this model and prompt, or None"""
+        key = prompt_key(model_name, prompt)
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute("SELECT text, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and now - row[1] >= self.ttl:
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                self.conn.commit()
+                return None
+            self.hits += 1
+            self.conn.execute("UPDATE responses SET used_at = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+        return row[0]
+
+    def put(self, model_name, prompt, text):
+        now = time.time()
+        size = len(text.encode('utf-8'))
+        with self._lock:
+            self.conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                              (prompt_key(model_name, prompt), model_name, text, size, now, now))
+            self.evict()
+            self.conn.commit()
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until within ``max_bytes`` and ``max_entries`` (lock held)"""
+        self.conn.execute("DELETE FROM responses WHERE created_at <= ?", (time.time() - self.ttl,))
+        count, total = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        excess_entries = count - self.max_entries if self.max_entries is not None else 0
+        excess_bytes = total - self.max_bytes
+        if excess_entries <= 0 and excess_bytes <= 0:
+            return
+        freed = 0
+        keys = []
+        for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY used_at"):
+            if len(keys) >= excess_entries and freed >= excess_bytes:
+                break
+            keys.append((key,))
+            freed += size
+        self.conn.executemany("DELETE FROM responses WHERE key = ?", keys)
+
+class CachedText:
+    """Stand-in for a Gemini response served from the cache; callers only read ``.text``"""
+
+    def __init__(self, text):
+        self.text = text
+
+class CachedModel:
+    """Wraps a model with ``generate_content`` so repeated prompts are answered from an ``LLMCache``.
+
+    Only plain string prompts are cached; anything else (chat history, images)
+    goes straight to the model.
+    """
+
+    def __init__(self, model, model_name, cache):
+        self.model = model
+        self.model_name = model_name
+        self.cache = cache
+
+    def generate_content(self, prompt, **kwargs):
+        if not isinstance(prompt, str) or kwargs:
+            return self.model.generate_content(prompt, **kwargs)
+        text = self.cache.get(self.model_name, prompt)
+        if text is not None:
+            return CachedText(text)
+        response = self.model.generate_content(prompt)
+        if response.text:
+            self.cache.put(self.model_name, prompt, response.text)
+        return response
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+class FakeModel:
+    """Offline model backend: answers from ``responses`` and records every prompt it is sent.
+
+    ``responses`` is a callable taking the prompt, or a dict whose first key
+    found in the prompt picks the answer; otherwise ``default`` is returned.
+    """
+
+    def __init__(self, responses=None, default='{"keywords": []}'):
+        self.responses = responses or {}
+        self.default = default
+        self.calls = []
+
+    def generate_content(self, prompt, **kwargs):
+        self.calls.append(prompt)
+        if callable(self.responses):
+            return CachedText(self.responses(prompt))
+        for fragment, text in self.responses.items():
+            if fragment in prompt:
+                return CachedText(text)
+        return CachedText(self.default)
+
+_default_cache = SharedDefault(LLMCache)
+
+def get_default_llm_cache():
+    """The process-wide LLM response cache shared by the app and the ICP chatbot"""
+    return _default_cache.get()
+
+def make_model(model_name, cache=None, backend=None):
+    """A ``generate_content`` model for ``model_name`` behind the response cache.
+
+    ``backend`` (or $ASTUTE_LLM_BACKEND) is 'gemini' by default or 'fake' for a
+    ``FakeModel`` that needs no network. ``cache=None`` uses the shared cache;
+    ``cache=False`` disables caching.
+    """
+    backend = backend or os.environ.get('ASTUTE_LLM_BACKEND', 'gemini')
+    if backend == 'fake':
+        model = FakeModel()
+    elif backend == 'gemini':
+        import google.generativeai as genai
+        model = genai.GenerativeModel(model_name)
+    else:
+        raise ValueError(f"Unknown LLM backend '{backend}', expected 'gemini' or 'fake'")
+
+    cache = _default_cache.resolve(cache)
+    if cache is None:
+        return model
+    # Fake answers never share entries with real ones
+    return CachedModel(model, model_name if backend == 'gemini' else f"{backend}:{model_name}", cache)
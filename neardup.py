@@ -0,0 +1,128 @@
+import hashlib
+import html
+import re
+
+import numpy as np
+
+from ngrams import tokenize
+
+# Markup whose text is never page content, then any remaining tag
+NON_TEXT_PATTERN = re.compile(
+    rb'<!--.*?-->|<(script|style|noscript|template)\b[^>]*>.*?</\1\s*>',
+    re.IGNORECASE | re.DOTALL
+)
+TAG_PATTERN = re.compile(rb'<[^>]*>')
+
+SHINGLE_SIZE = 3
+# Pages with fewer words than this are too thin to fingerprint reliably
+MIN_WORDS = 20
+FINGERPRINT_BITS = 64
+
+def page_text(body, encoding='utf-8'):
+    """Visible text of raw HTML bytes, without building a DOM"""
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+        encoding = 'utf-8'
+    body = NON_TEXT_PATTERN.sub(b' ', body)
+    body = TAG_PATTERN.sub(b' ', body)
+    return html.unescape(body.decode(encoding, errors='replace'))
+
+def mix64(values):
+    """splitmix64 finalizer over a uint64 array (wrapping arithmetic)"""
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+def simhash(words, shingle_size=SHINGLE_SIZE):
+    """64-bit SimHash of a word list over its overlapping ``shingle_size``-word shingles.
+
+    Each distinct word is hashed once; shingle hashes are combined from those
+    with vectorized uint64 arithmetic and every bit is decided by a majority
+    vote across shingles. Returns None for lists shorter than one shingle.
+    """
+    if len(words) < shingle_size:
+        return None
+
+    codes = dict.fromkeys(words)
+    for word in codes:
+        codes[word] = int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest(), 'little')
+    word_hashes = np.fromiter((codes[word] for word in words), dtype=np.uint64, count=len(words))
+
+    shingles = np.zeros(len(words) - shingle_size + 1, dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for offset in range(shingle_size):
+            shingles = mix64(shingles ^ word_hashes[offset:len(shingles) + offset])
+
+    bits = np.unpackbits(shingles.astype('<u8').view(np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+    majority = bits.sum(axis=0, dtype=np.int64) * 2 > len(shingles)
+    return int(np.packbits(majority, bitorder='little').view('<u8')[0])
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+class NearDuplicateIndex:
+    """SimHash fingerprints of crawled pages, bucketed for near-duplicate lookups.
+
+    A fingerprint is split into ``bands`` equal bit ranges and stored under each
+    band's value. Two fingerprints within ``max_distance`` bits of each other
+    must agree on at least one band when ``bands > max_distance``, so a lookup
+    only compares against pages sharing a bucket instead of every page seen.
+    The first page of each cluster is its representative; later near copies
+    (faceted or tracking-parameter URLs, printer-friendly versions) map to it.
+    """
+
+    def __init__(self, max_distance=3, bands=4, min_words=MIN_WORDS):
+        if bands <= max_distance or FINGERPRINT_BITS % bands:
+            raise ValueError("bands must divide 64 and exceed max_distance")
+        self.max_distance = max_distance
+        self.bands = bands
+        self.band_bits = FINGERPRINT_BITS // bands
+        self.min_words = min_words
+        self.buckets = {}
+        self.fingerprints = {}
+        self.representatives = {}
+
+    def __len__(self):
+        return len(self.fingerprints)
+
+    def band_keys(self, fingerprint):
+        mask = (1 << self.band_bits) - 1
+        return [(band, (fingerprint >> (band * self.band_bits)) & mask) for band in range(self.bands)]
+
+    def find(self, fingerprint):
+        """URL of an indexed page within ``max_distance`` bits of ``fingerprint``, or None"""
+        best_url, best_distance = None, self.max_distance + 1
+        for key in self.band_keys(fingerprint):
+            for url in self.buckets.get(key, ()):
+                distance = hamming_distance(fingerprint, self.fingerprints[url])
+                if distance < best_distance:
+                    best_url, best_distance = url, distance
+        return best_url
+
+    def add(self, url, fingerprint):
+        """Record a page; returns the representative URL it duplicates, or None if it is new"""
+        original = self.find(fingerprint)
+        if original is not None:
+            self.representatives[url] = original
+            return original
+
+        self.fingerprints[url] = fingerprint
+        for key in self.band_keys(fingerprint):
+            self.buckets.setdefault(key, []).append(url)
+        return None
+
+    def check_page(self, url, body, encoding='utf-8'):
+        """Fingerprint a fetched page's text and ``add`` it; thin pages are never treated as duplicates"""
+        words = tokenize(page_text(body, encoding))
+        if len(words) < self.min_words:
+            return None
+        return self.add(url, simhash(words))
+
+    def clusters(self):
+        """``{representative: [duplicate urls]}`` for every page that had near copies"""
+        clusters = {}
+        for url, original in self.representatives.items():
+            clusters.setdefault(original, []).append(url)
+        return clusters
@@ -0,0 +1,339 @@
+import http.client
+import os
+import socket
+import ssl
+import time
+import zlib
+from urllib.parse import urljoin, urlparse
+
+import aiohttp
+import requests
+from requests.utils import DEFAULT_CA_BUNDLE_PATH, get_encoding_from_headers, get_environ_proxies, select_proxy
+
+from httpcache import BodyReader, CHUNK_SIZE, DEFAULT_MAX_BODY_BYTES, fetch_streamed
+
+ALPN_PROTOCOLS = ['h2', 'http/1.1']
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+MAX_REDIRECTS = 10
+
+def parse_alt_svc(value):
+    """Protocol IDs advertised in an Alt-Svc header, e.g. ``['h3', 'h3-29']``"""
+    if not value or value.strip() == 'clear':
+        return []
+    protocols = []
+    for entry in value.split(','):
+        protocol = entry.split('=', 1)[0].strip()
+        if protocol:
+            protocols.append(protocol)
+    return protocols
+
+def default_context():
+    """A verifying ``ssl.SSLContext`` trusting the same CAs as ``requests`` ($REQUESTS_CA_BUNDLE, else certifi)"""
+    cafile = os.environ.get('REQUESTS_CA_BUNDLE') or os.environ.get('CURL_CA_BUNDLE') or DEFAULT_CA_BUNDLE_PATH
+    if os.path.isdir(cafile):
+        return ssl.create_default_context(capath=cafile)
+    return ssl.create_default_context(cafile=cafile)
+
+def open_connection(host, port, timeout, context=None, alpn=None, session=None):
+    """Open a TCP (and, with ``context``, TLS) connection, returning ``(sock, connect_ms, tls_ms)``"""
+    start_time = time.perf_counter()
+    sock = socket.create_connection((host, port), timeout=timeout)
+    connect_ms = (time.perf_counter() - start_time) * 1000
+    if context is None:
+        return sock, connect_ms, None
+
+    if alpn:
+        context.set_alpn_protocols(alpn)
+    start_time = time.perf_counter()
+    try:
+        sock = context.wrap_socket(sock, server_hostname=host, session=session)
+    except Exception:
+        sock.close()
+        raise
+    return sock, connect_ms, (time.perf_counter() - start_time) * 1000
+
+def head_request(sock, host, path='/'):
+    """Send an HTTP/1.1 HEAD over an open connection and return the response headers"""
+    request = (f"HEAD {path} HTTP/1.1\r\nHost: {host}\r\n"
+               "User-Agent: AstuteAI protocol probe\r\nConnection: close\r\n\r\n")
+    sock.sendall(request.encode('ascii'))
+    response = http.client.HTTPResponse(sock, method='HEAD')
+    try:
+        response.begin()
+        return response.status, response.headers
+    finally:
+        response.close()
+
+def probe_protocols(url, timeout=10, context=None):
+    """Find which HTTP versions a server offers.
+
+    HTTP/2 is detected by negotiating ALPN ('h2' vs 'http/1.1') during the TLS
+    handshake and HTTP/3 by an ``h3`` entry in the Alt-Svc response header. The
+    Alt-Svc HEAD request reuses the probe connection when it negotiated HTTP/1.1;
+    after an 'h2' handshake it opens one more HTTP/1.1 connection, resuming the
+    TLS session. Every socket is closed before returning.
+
+    ``context`` overrides the default verifying ``ssl.SSLContext`` (for example
+    one trusting a self-signed test certificate).
+    """
+    parsed_url = urlparse(url)
+    host = parsed_url.hostname
+    is_https = parsed_url.scheme == 'https'
+    port = parsed_url.port or (443 if is_https else 80)
+    if is_https and context is None:
+        context = default_context()
+
+    result = {
+        "alpn": None,
+        "http2": False,
+        "http3": False,
+        "alt_svc": [],
+        "tls_version": None,
+        "connect_ms": None,
+        "tls_handshake_ms": None,
+        "error": None,
+    }
+
+    try:
+        sock, connect_ms, tls_ms = open_connection(host, port, timeout, context if is_https else None,
+                                                   ALPN_PROTOCOLS)
+        with sock:
+            result["connect_ms"] = round(connect_ms, 2)
+            if is_https:
+                result["tls_handshake_ms"] = round(tls_ms, 2)
+                result["tls_version"] = sock.version()
+                result["alpn"] = sock.selected_alpn_protocol()
+                result["http2"] = result["alpn"] == 'h2'
+
+            if result["alpn"] != 'h2':
+                _, headers = head_request(sock, parsed_url.netloc)
+            else:
+                session = sock.session
+                sock.close()
+                http1_sock, _, _ = open_connection(host, port, timeout, context, ['http/1.1'], session)
+                with http1_sock:
+                    _, headers = head_request(http1_sock, parsed_url.netloc)
+
+        result["alt_svc"] = parse_alt_svc(headers.get('Alt-Svc'))
+        result["http3"] = any(protocol == 'h3' or protocol.startswith('h3-') for protocol in result["alt_svc"])
+    except (OSError, http.client.HTTPException) as e:
+        result["error"] = str(e)
+
+    return result
+
+def elapsed_ms(start_time):
+    return round((time.perf_counter() - start_time) * 1000, 2)
+
+def decompressor_for(content_encoding):
+    """Incremental decoder for a gzip/deflate body, or None for an identity one"""
+    content_encoding = (content_encoding or '').strip().lower()
+    if content_encoding in ('gzip', 'x-gzip'):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if content_encoding == 'deflate':
+        # zlib-wrapped deflate is what servers send in practice
+        return zlib.decompressobj(zlib.MAX_WBITS)
+    return None
+
+def feed_decompressed(reader, decompressor, data):
+    """Inflate ``data`` into ``reader`` at most ``CHUNK_SIZE`` bytes at a time.
+
+    The reader's size cap is checked after every piece, so a compression bomb
+    is rejected before it is expanded in memory.
+    """
+    while True:
+        chunk = decompressor.decompress(data, CHUNK_SIZE)
+        reader.feed(chunk)
+        data = decompressor.unconsumed_tail
+        if not data and len(chunk) < CHUNK_SIZE:
+            return
+
+def connect_any(host, port, timeout):
+    """Connect to the first reachable address ``host`` resolves to, returning ``(sock, dns_ms, connect_ms)``"""
+    start_time = time.perf_counter()
+    addresses = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    dns_ms = elapsed_ms(start_time)
+
+    start_time = time.perf_counter()
+    error = None
+    for family, socktype, proto, _, address in addresses:
+        sock = socket.socket(family, socktype, proto)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(address)
+        except OSError as e:
+            sock.close()
+            error = e
+            continue
+        # Time spent on unreachable addresses is part of what the visitor waits for
+        return sock, dns_ms, elapsed_ms(start_time)
+    raise error or OSError(f"No addresses found for {host}")
+
+def timed_request(url, headers, timeout, max_bytes, context=None):
+    """One GET with every network phase timed, returning ``(response, timing)``"""
+    parsed_url = urlparse(url)
+    host = parsed_url.hostname
+    is_https = parsed_url.scheme == 'https'
+    default_port = 443 if is_https else 80
+    port = parsed_url.port or default_port
+    path = parsed_url.path or '/'
+    if parsed_url.query:
+        path += '?' + parsed_url.query
+    # Sent explicitly: the plain HTTPConnection below would add ':443' to the Host of HTTPS requests
+    host_header = f"[{host}]" if ':' in host else host
+    if port != default_port:
+        host_header += f":{port}"
+    timing = {"dns_ms": None, "connect_ms": None, "tls_ms": None, "ttfb_ms": None, "download_ms": None}
+
+    sock, timing["dns_ms"], timing["connect_ms"] = connect_any(host, port, timeout)
+    try:
+        if is_https:
+            context = context or default_context()
+            context.set_alpn_protocols(['http/1.1'])
+            start_time = time.perf_counter()
+            sock = context.wrap_socket(sock, server_hostname=host)
+            timing["tls_ms"] = elapsed_ms(start_time)
+
+        conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        conn.sock = sock
+        request_headers = {'Host': host_header, 'Accept-Encoding': 'gzip, deflate'}
+        request_headers.update(headers or {})
+
+        start_time = time.perf_counter()
+        conn.request('GET', path, headers=request_headers)
+        response = conn.getresponse()
+        timing["ttfb_ms"] = elapsed_ms(start_time)
+
+        response_headers = dict(response.headers)
+        content_encoding = response.headers.get('Content-Encoding')
+        decompressor = decompressor_for(content_encoding)
+        reader = BodyReader(url, get_encoding_from_headers(response.headers), max_bytes)
+        transfer_bytes = 0
+
+        start_time = time.perf_counter()
+        if response.status not in REDIRECT_STATUSES:
+            while True:
+                chunk = response.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                transfer_bytes += len(chunk)
+                if decompressor:
+                    feed_decompressed(reader, decompressor, chunk)
+                else:
+                    reader.feed(chunk)
+            if decompressor:
+                feed_decompressed(reader, decompressor, b'')
+        timing["download_ms"] = elapsed_ms(start_time)
+    finally:
+        sock.close()
+
+    page = reader.response(response.status, response_headers)
+    record_body(timing, transfer_bytes, len(page.content), content_encoding)
+    return page, timing
+
+def record_body(timing, transfer_bytes, body_bytes, content_encoding):
+    """Add the transfer size (None if unknown), body size and compression ratio to a timing breakdown"""
+    timing["transfer_bytes"] = transfer_bytes
+    timing["body_bytes"] = body_bytes
+    timing["content_encoding"] = content_encoding or "identity"
+    timing["compression_ratio"] = round(body_bytes / transfer_bytes, 2) if transfer_bytes else None
+
+def timed_fetch(url, headers=None, timeout=10, max_redirects=MAX_REDIRECTS,
+                max_bytes=DEFAULT_MAX_BODY_BYTES, context=None):
+    """GET a URL on fresh connections, timing DNS, connect, TLS, TTFB and download.
+
+    Redirects are followed (up to ``max_redirects``) and each hop is recorded.
+    Returns a ``CachedResponse`` whose ``timing`` holds the breakdown of the
+    final request plus the transfer size, compression ratio, redirect chain and
+    total time; ``elapsed`` is the total in seconds.
+
+    When $HTTP_PROXY/$HTTPS_PROXY applies to the URL, the page is fetched
+    through the proxy with ``requests`` instead, and ``timing`` only says why
+    the phases were not measured.
+    """
+    if select_proxy(url, get_environ_proxies(url)):
+        return proxied_fetch(url, headers, timeout, max_redirects, max_bytes)
+
+    start_time = time.perf_counter()
+    redirects = []
+
+    while True:
+        page, timing = timed_request(url, headers, timeout, max_bytes, context)
+        location = page.headers.get('Location')
+        if page.status_code not in REDIRECT_STATUSES or not location:
+            break
+        if len(redirects) >= max_redirects:
+            raise http.client.HTTPException(f"More than {max_redirects} redirects from {redirects[0]['url']}")
+        redirects.append({"url": url, "status": page.status_code,
+                          "time_ms": round(sum(timing[key] or 0 for key in
+                                               ("dns_ms", "connect_ms", "tls_ms", "ttfb_ms", "download_ms")), 2)})
+        url = urljoin(url, location)
+
+    timing["redirects"] = redirects
+    timing["redirect_count"] = len(redirects)
+    timing["total_ms"] = elapsed_ms(start_time)
+    page.timing = timing
+    page.elapsed = timing["total_ms"] / 1000
+    return page
+
+def proxied_fetch(url, headers, timeout, max_redirects, max_bytes):
+    """``timed_fetch`` for URLs behind a proxy, where a direct connection would bypass it"""
+    with requests.Session() as session:
+        session.max_redirects = max_redirects
+        page = fetch_streamed(url, session, headers, timeout, max_bytes=max_bytes)
+    page.timing = {"error": "the request went through a proxy"}
+    return page
+
+def timing_trace_config():
+    """An ``aiohttp.TraceConfig`` that fills in the dict passed as a request's ``trace_request_ctx``.
+
+    The dict gets the phases ``timed_fetch`` measures, except that aiohttp
+    reports the TCP connect and the TLS handshake as one step, so
+    ``connect_ms`` covers both and ``tls_ms`` stays None. A request on a
+    reused keep-alive connection (or with a cached DNS answer) has no connect
+    (or DNS) time. ``complete_timing`` adds the rest once the body is read.
+    """
+    trace_config = aiohttp.TraceConfig()
+
+    def add_phase(key, start_signal, end_signal):
+        async def on_start(session, context, params):
+            setattr(context, key, time.perf_counter())
+
+        async def on_end(session, context, params):
+            if context.trace_request_ctx is not None and hasattr(context, key):
+                context.trace_request_ctx[key] = elapsed_ms(getattr(context, key))
+
+        start_signal.append(on_start)
+        end_signal.append(on_end)
+
+    add_phase("dns_ms", trace_config.on_dns_resolvehost_start, trace_config.on_dns_resolvehost_end)
+    add_phase("connect_ms", trace_config.on_connection_create_start, trace_config.on_connection_create_end)
+    add_phase("ttfb_ms", trace_config.on_request_headers_sent, trace_config.on_request_end)
+
+    async def on_request_start(session, context, params):
+        context.hop_started = time.perf_counter()
+
+    async def on_request_redirect(session, context, params):
+        timing = context.trace_request_ctx
+        if timing is not None:
+            timing.setdefault("redirects", []).append({"url": str(params.url), "status": params.response.status,
+                                                       "time_ms": elapsed_ms(context.hop_started)})
+            # The breakdown describes the final request, as in ``timed_fetch``
+            timing.update(dns_ms=None, connect_ms=None, ttfb_ms=None)
+        context.hop_started = time.perf_counter()
+
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_redirect.append(on_request_redirect)
+    return trace_config
+
+def complete_timing(timing, download_start, total_ms, transfer_bytes, body_bytes, content_encoding):
+    """Finish a breakdown recorded by ``timing_trace_config``; None if the session did not trace the request"""
+    if timing.get("ttfb_ms") is None:
+        return None
+    result = {"dns_ms": None, "connect_ms": None, "tls_ms": None}
+    result.update(timing)
+    result["download_ms"] = elapsed_ms(download_start)
+    record_body(result, transfer_bytes, body_bytes, content_encoding)
+    result["redirects"] = timing.get("redirects", [])
+    result["redirect_count"] = len(result["redirects"])
+    result["total_ms"] = total_ms
+    return result
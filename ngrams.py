@@ -0,0 +1,97 @@
+import re
+from collections import Counter
+
+import numpy as np
+
+WORD_PATTERN = re.compile(r'\b[a-zA-Z]{3,}\b')
+
+# Common English stopwords left out of the top keywords
+STOPWORDS = frozenset(['the', 'and', 'are', 'for', 'was', 'not', 'you', 'but', 'his', 'her', 'they',
+                       'she', 'will', 'with', 'from', 'that', 'this', 'have', 'has'])
+
+# n-grams are packed into one int64 key per position while vocabulary ** n fits
+MAX_PACKED_KEY = 2 ** 62
+
+def tokenize(text):
+    """Lowercase words of three or more letters, in order"""
+    return WORD_PATTERN.findall(text.lower())
+
+def top_ranked(counts, first_seen, n):
+    """Indices of the ``n`` highest counts, ties broken by earliest first appearance"""
+    if len(counts) > n:
+        # Only entries at or above the n-th largest count can make the cut
+        threshold = np.partition(counts, len(counts) - n)[len(counts) - n]
+        candidates = np.flatnonzero(counts >= threshold)
+    else:
+        candidates = np.arange(len(counts))
+    order = np.lexsort((first_seen[candidates], -counts[candidates]))
+    return candidates[order[:n]]
+
+class NgramStats:
+    """Word, 2-gram and 3-gram frequencies from a single tokenization pass.
+
+    Tokens are integer-encoded once, with codes in order of first appearance.
+    Word counts come from one ``bincount``. Each n-gram is packed into a single
+    integer key taken from shifted views of the code array, and those keys are
+    counted with one vectorized ``unique``. No phrase strings are built except
+    for the few that are reported. ``most_common`` matches ``Counter.most_common``
+    over the phrase strings, including how ties are ordered.
+    """
+
+    def __init__(self, text):
+        self.words = tokenize(text)
+        codes = dict.fromkeys(self.words)
+        for code, word in enumerate(codes):
+            codes[word] = code
+        self.codes_by_word = codes
+        self.vocabulary = list(codes)
+        self.codes = np.fromiter(map(codes.__getitem__, self.words), dtype=np.int64, count=len(self.words))
+        self.word_counts = np.bincount(self.codes, minlength=len(self.vocabulary))
+
+    @property
+    def total(self):
+        return len(self.words)
+
+    def term_counts(self):
+        """Parallel lists of every distinct word and its count, for ``siteindex.SiteIndex``"""
+        return self.vocabulary, self.word_counts.tolist()
+
+    def count(self, word):
+        code = self.codes_by_word.get(word)
+        return int(self.word_counts[code]) if code is not None else 0
+
+    def most_common(self, n, size=1):
+        """The ``n`` most frequent words (``size=1``) or phrases, as ``(text, count)`` pairs"""
+        vocabulary = self.vocabulary
+        if size == 1:
+            # A word's code is its rank of first appearance
+            ranked = top_ranked(self.word_counts, np.arange(len(vocabulary)), n)
+            return [(vocabulary[code], int(self.word_counts[code])) for code in ranked]
+
+        positions = len(self.codes) - size + 1
+        if positions <= 0:
+            return []
+        if len(vocabulary) ** size >= MAX_PACKED_KEY:
+            return self.most_common_unpacked(n, size)
+
+        keys = self.codes[:positions].copy()
+        for offset in range(1, size):
+            keys *= len(vocabulary)
+            keys += self.codes[offset:offset + positions]
+        unique_keys, first_seen, counts = np.unique(keys, return_index=True, return_counts=True)
+
+        phrases = []
+        for index in top_ranked(counts, first_seen, n):
+            start = first_seen[index]
+            phrases.append((" ".join(self.words[start:start + size]), int(counts[index])))
+        return phrases
+
+    def most_common_unpacked(self, n, size):
+        """Tuple-keyed fallback for vocabularies too large to pack ``size`` codes into an int64"""
+        codes = self.codes.tolist()
+        counts = Counter(zip(*(codes[offset:] for offset in range(size))))
+        return [(" ".join(self.vocabulary[code] for code in gram), count) for gram, count in counts.most_common(n)]
+
+    def top_keywords(self, n=10, candidates=30):
+        """Most frequent non-stopwords among the ``candidates`` most frequent words"""
+        return [word for word, count in self.most_common(candidates) if word not in STOPWORDS][:n]
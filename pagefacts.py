@@ -0,0 +1,258 @@
+import json
+import zlib
+from array import array
+
+import numpy as np
+
+# Scalar results stored as typed columns: (column name, path in the results dict, type)
+COLUMNS = (
+    ("error", ("error",), str),
+    ("title", ("on_page", "title", "text"), str),
+    ("title_length", ("on_page", "title", "length"), int),
+    ("title_word_count", ("on_page", "title", "word_count"), int),
+    ("meta_description", ("on_page", "meta_description", "text"), str),
+    ("meta_description_length", ("on_page", "meta_description", "length"), int),
+    ("meta_description_word_count", ("on_page", "meta_description", "word_count"), int),
+    ("word_count", ("on_page", "text", "word_count"), int),
+    ("internal_links", ("on_page", "links", "internal_count"), int),
+    ("external_links", ("on_page", "links", "external_count"), int),
+    ("links_without_title", ("on_page", "links", "without_title"), int),
+    ("links_without_text", ("on_page", "links", "without_text"), int),
+    ("nofollow_links", ("on_page", "links", "nofollow_count"), int),
+    ("images", ("on_page", "images", "total"), int),
+    ("images_without_alt", ("on_page", "images", "without_alt"), int),
+    ("images_without_title", ("on_page", "images", "without_title"), int),
+    ("h1_count", ("on_page", "headings", "h1_count"), int),
+    ("h2_count", ("on_page", "headings", "h2_count"), int),
+    ("h3_count", ("on_page", "headings", "h3_count"), int),
+    ("robots_txt", ("technical", "robots_txt"), bool),
+    ("sitemap_xml", ("technical", "sitemap_xml"), bool),
+    ("canonical", ("technical", "canonical", "present"), bool),
+    ("canonical_url", ("technical", "canonical", "url"), str),
+    ("robots_meta", ("technical", "robots_meta", "present"), bool),
+    ("html5_doctype", ("technical", "html5_doctype"), bool),
+    ("http2_support", ("technical", "http2_support"), bool),
+    ("http3_support", ("technical", "http3_support"), bool),
+    ("responsive_design", ("technical", "responsive_design"), bool),
+    ("open_graph", ("technical", "open_graph"), bool),
+    ("twitter_cards", ("technical", "twitter_cards"), bool),
+    ("structured_data", ("technical", "structured_data"), bool),
+    ("inline_styles", ("technical", "css_js", "inline_styles"), int),
+    ("inline_scripts", ("technical", "css_js", "inline_scripts"), int),
+    ("external_scripts", ("technical", "css_js", "external_scripts"), int),
+    ("frames", ("technical", "frames"), int),
+    ("code_size", ("technical", "code_text_ratio", "code_size"), int),
+    ("text_size", ("technical", "code_text_ratio", "text_size"), int),
+    ("text_ratio", ("technical", "code_text_ratio", "ratio"), float),
+    ("load_time", ("performance", "load_time"), float),
+    ("flesch_score", ("semantics", "readability", "flesch_score"), int),
+    ("readability_level", ("semantics", "readability", "level"), str),
+    ("words_per_sentence", ("semantics", "readability", "words_per_sentence"), float),
+    ("syllables_per_word", ("semantics", "readability", "syllables_per_word"), float),
+    ("long_sentence_ratio", ("semantics", "readability", "long_sentence_ratio"), float),
+    ("passive_voice_ratio", ("semantics", "readability", "passive_voice_ratio"), float),
+)
+COLUMN_NAMES = tuple(name for name, path, kind in COLUMNS)
+# Python array typecodes; strings are ids into a shared pool of distinct values
+TYPECODES = {str: 'I', int: 'q', bool: 'b', float: 'd'}
+INT_RANGE = (-2 ** 63, 2 ** 63)
+
+def is_storable(value, kind):
+    if kind is int:
+        return type(value) is int and INT_RANGE[0] <= value < INT_RANGE[1]
+    return type(value) is kind
+
+def pop_leaf(results, path):
+    """Take the value at ``path``, leaving a None placeholder so the dict keeps its key order"""
+    node = results
+    for key in path[:-1]:
+        node = node.get(key) if isinstance(node, dict) else None
+    if not isinstance(node, dict) or path[-1] not in node:
+        return False, None
+    value = node[path[-1]]
+    node[path[-1]] = None
+    return True, value
+
+def put_leaf(results, path, value):
+    node = results
+    for key in path[:-1]:
+        node = node[key]
+    node[path[-1]] = value
+
+def pop_issues(node, path=(), found=None):
+    """Take every "issues" list out of a results dict as ``(section path, issue)`` pairs, in order"""
+    found = [] if found is None else found
+    for key, value in node.items():
+        if key == "issues" and isinstance(value, list):
+            found.extend(("/".join(path), issue) for issue in value)
+            node[key] = []
+        elif isinstance(value, dict):
+            pop_issues(value, path + (key,), found)
+    return found
+
+def put_issues(results, issues):
+    for section, issue in issues:
+        node = results
+        if section:
+            for key in section.split("/"):
+                node = node[key]
+        node["issues"].append(issue)
+
+class PageFacts:
+    """One page's ``SEOAnalyzer`` results in compact form.
+
+    The scalar fields listed in ``COLUMNS`` are kept as a flat tuple, the
+    issues as ``(section, text)`` pairs, and everything else (heading
+    structure, keyword tables, timing, page weight) as zlib-compressed JSON.
+    ``to_results`` rebuilds the original dict shape.
+    """
+
+    __slots__ = ('url', 'values', 'present', 'issues', 'extra')
+
+    def __init__(self, url, values, present, issues, extra):
+        self.url = url
+        self.values = values
+        # Bit i set when column i held a value of its type (None/absent otherwise); at most 64 columns
+        self.present = present
+        self.issues = issues
+        self.extra = extra
+
+    @classmethod
+    def from_results(cls, url, results):
+        remainder = json.loads(json.dumps(results, default=str))
+        values = []
+        present = 0
+        for position, (name, path, kind) in enumerate(COLUMNS):
+            found, value = pop_leaf(remainder, path)
+            if found and is_storable(value, kind):
+                present |= 1 << position
+                values.append(value)
+            else:
+                if found:
+                    put_leaf(remainder, path, value)
+                values.append(None)
+        issues = tuple(pop_issues(remainder))
+        extra = zlib.compress(json.dumps(remainder, separators=(',', ':')).encode('utf-8'))
+        return cls(url, tuple(values), present, issues, extra)
+
+    def __getattr__(self, name):
+        try:
+            return self.values[COLUMN_NAMES.index(name)]
+        except ValueError:
+            raise AttributeError(name) from None
+
+    def to_results(self):
+        """The results dict as ``SEOAnalyzer.analyze`` returned it (after a JSON round trip)"""
+        results = json.loads(zlib.decompress(self.extra))
+        for position, (name, path, kind) in enumerate(COLUMNS):
+            if self.present >> position & 1:
+                put_leaf(results, path, self.values[position])
+        put_issues(results, self.issues)
+        return results
+
+class AuditTable:
+    """Columnar store of many pages' results for site-wide audits.
+
+    Each column of ``COLUMNS`` is a typed ``array`` (strings as ids into one
+    pool of distinct values), issues are CSR-style flat arrays with per-page
+    offsets, and the rest of each page's results is a compressed JSON blob.
+    ``to_dataframe`` hands the columns to pandas through numpy without
+    re-parsing anything; ``results(url)`` rebuilds one page's dict on demand.
+    """
+
+    def __init__(self):
+        self.urls = []
+        self.rows = {}
+        self.strings = []
+        self.string_ids = {}
+        self.columns = {name: array(TYPECODES[kind]) for name, path, kind in COLUMNS}
+        self.present = array('Q')
+        self.issue_sections = array('I')
+        self.issue_texts = array('I')
+        self.issue_offsets = array('Q', [0])
+        self.extras = []
+
+    def __len__(self):
+        return len(self.urls)
+
+    def __contains__(self, url):
+        return url in self.rows
+
+    def intern(self, text):
+        string_id = self.string_ids.get(text)
+        if string_id is None:
+            string_id = self.string_ids[text] = len(self.strings)
+            self.strings.append(text)
+        return string_id
+
+    def add(self, url, results):
+        """Store a page's results (a dict or ``PageFacts``); re-adding a URL keeps both rows"""
+        facts = results if isinstance(results, PageFacts) else PageFacts.from_results(url, results)
+        self.rows[url] = len(self.urls)
+        self.urls.append(url)
+        for position, (name, path, kind) in enumerate(COLUMNS):
+            value = facts.values[position]
+            if kind is str:
+                value = self.intern(value or "")
+            elif value is None:
+                value = kind()
+            self.columns[name].append(value)
+        self.present.append(facts.present)
+        for section, issue in facts.issues:
+            self.issue_sections.append(self.intern(section))
+            self.issue_texts.append(self.intern(issue))
+        self.issue_offsets.append(len(self.issue_texts))
+        self.extras.append(facts.extra)
+
+    def page(self, row):
+        values = []
+        present = self.present[row]
+        for position, (name, path, kind) in enumerate(COLUMNS):
+            value = self.columns[name][row]
+            if not present >> position & 1:
+                value = None
+            elif kind is str:
+                value = self.strings[value]
+            elif kind is bool:
+                value = bool(value)
+            values.append(value)
+        start, end = self.issue_offsets[row], self.issue_offsets[row + 1]
+        issues = tuple((self.strings[self.issue_sections[i]], self.strings[self.issue_texts[i]])
+                       for i in range(start, end))
+        return PageFacts(self.urls[row], tuple(values), present, issues, self.extras[row])
+
+    def results(self, url):
+        """Dict view of the latest results stored for ``url``"""
+        return self.page(self.rows[url]).to_results()
+
+    def items(self):
+        """``(url, results dict)`` for every stored page, in insertion order"""
+        for row, url in enumerate(self.urls):
+            yield url, self.page(row).to_results()
+
+    def issue_counts(self):
+        return np.diff(np.frombuffer(self.issue_offsets, dtype=np.uint64)).astype(np.int64)
+
+    def to_dataframe(self, columns=COLUMN_NAMES):
+        """One row per page with the chosen columns; strings become categoricals and missing values NA"""
+        import pandas as pd
+
+        present = np.frombuffer(self.present, dtype=np.uint64)
+        kinds = {name: kind for name, path, kind in COLUMNS}
+        data = {"url": self.urls}
+        for name in columns:
+            kind = kinds[name]
+            values = np.frombuffer(self.columns[name], dtype=np.dtype(self.columns[name].typecode))
+            mask = (present >> np.uint64(COLUMN_NAMES.index(name))) & np.uint64(1) == 0
+            if kind is str:
+                codes = np.where(mask, -1, values.astype(np.int64))
+                data[name] = pd.Categorical.from_codes(codes, categories=self.strings) if self.strings else codes
+            elif kind is bool:
+                data[name] = pd.arrays.BooleanArray(values.astype(bool), mask)
+            elif kind is int:
+                data[name] = pd.arrays.IntegerArray(values.astype(np.int64), mask)
+            else:
+                data[name] = np.where(mask, np.nan, values)
+        frame = pd.DataFrame(data)
+        frame["issues"] = self.issue_counts()
+        return frame
@@ -0,0 +1,190 @@
+import asyncio
+import re
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
+
+import aiohttp
+
+FONT_FACE_URL = re.compile(r"@font-face\s*{[^}]*}", re.IGNORECASE)
+CSS_URL = re.compile(r"""url\(\s*['"]?([^'")]+)['"]?\s*\)""", re.IGNORECASE)
+MAX_AGE = re.compile(r"max-age\s*=\s*(\d+)", re.IGNORECASE)
+# Content types that should be served compressed
+COMPRESSIBLE_TYPES = ('script', 'stylesheet')
+
+LARGEST_COUNT = 5
+PAGE_WEIGHT_LIMIT = 3 * 1024 * 1024
+LARGE_IMAGE_LIMIT = 500 * 1024
+
+def collect_resources(facts, page_url):
+    """Absolute ``(url, type)`` pairs for the page's scripts, stylesheets, images and fonts, deduplicated.
+
+    Fonts are those preloaded with ``<link rel=preload as=font>`` or declared in
+    inline ``@font-face`` rules; fonts referenced only from external stylesheets
+    are not followed.
+    """
+    candidates = [(src, 'script') for src in facts.script_sources]
+    candidates += [(href, 'stylesheet') for href in facts.stylesheets]
+    candidates += [(img.get('src'), 'image') for img in facts.images]
+    candidates += [(href, 'font') for href in facts.font_links]
+    for style in facts.style_texts:
+        for font_face in FONT_FACE_URL.findall(style):
+            candidates += [(src, 'font') for src in CSS_URL.findall(font_face)]
+
+    resources = {}
+    for src, resource_type in candidates:
+        if not src or src.strip().startswith('data:'):
+            continue
+        try:
+            url = urljoin(page_url, src.strip())
+        except ValueError:
+            # e.g. an unterminated IPv6 host such as "http://[bad"
+            continue
+        if urlparse(url).scheme in ('http', 'https') and url not in resources:
+            resources[url] = resource_type
+    return list(resources.items())
+
+def cache_policy(headers):
+    """Cacheability of a resource from its Cache-Control / Expires / validator headers"""
+    cache_control = headers.get('Cache-Control', '')
+    directives = cache_control.lower()
+    max_age = MAX_AGE.search(directives)
+    max_age = int(max_age.group(1)) if max_age else None
+
+    if 'no-store' in directives or 'no-cache' in directives:
+        cacheable = False
+    elif max_age is not None:
+        cacheable = max_age > 0
+    else:
+        cacheable = bool(headers.get('Expires'))
+
+    return {
+        "cache_control": cache_control or None,
+        "max_age": max_age,
+        "cacheable": cacheable,
+        "validator": bool(headers.get('ETag') or headers.get('Last-Modified')),
+    }
+
+def content_length(response):
+    """Body size from Content-Length, or the total from a ranged response's Content-Range"""
+    content_range = response.headers.get('Content-Range', '')
+    if '/' in content_range:
+        total = content_range.rsplit('/', 1)[1]
+        if total.isdigit():
+            return int(total)
+    length = response.headers.get('Content-Length')
+    return int(length) if length and length.isdigit() else None
+
+async def fetch_headers(session, url, accept_encoding, timeout):
+    """Response headers and size for a resource: HEAD, falling back to a one-byte ranged GET"""
+    headers = {'Accept-Encoding': accept_encoding}
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+
+    async with session.head(url, headers=headers, allow_redirects=True, timeout=client_timeout) as response:
+        if response.status < 400 and content_length(response) is not None:
+            return response.status, response.headers, content_length(response)
+
+    headers['Range'] = 'bytes=0-0'
+    async with session.get(url, headers=headers, allow_redirects=True, timeout=client_timeout) as response:
+        # A server ignoring Range sends the whole body; its Content-Length is then the size
+        return response.status, response.headers, content_length(response)
+
+async def measure_resource(session, semaphore, url, resource_type, timeout):
+    async with semaphore:
+        try:
+            status, headers, size = await fetch_headers(session, url, 'gzip, deflate, br', timeout)
+            encoding = headers.get('Content-Encoding', 'identity').lower()
+            uncompressed = size
+            if encoding != 'identity' and size is not None:
+                _, _, uncompressed = await fetch_headers(session, url, 'identity', timeout)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return {"url": url, "type": resource_type, "error": str(e) or type(e).__name__}
+
+    resource = {
+        "url": url,
+        "type": resource_type,
+        "status": status,
+        "bytes": size,
+        "uncompressed_bytes": uncompressed,
+        "content_encoding": encoding,
+        "content_type": headers.get('Content-Type'),
+    }
+    resource.update(cache_policy(headers))
+    return resource
+
+async def fetch_resource_headers(resources, session=None, concurrency=16, timeout=10):
+    """Fetch headers for ``(url, type)`` resources concurrently over one pooled session"""
+    semaphore = asyncio.Semaphore(concurrency)
+    if session is not None:
+        return await asyncio.gather(*(measure_resource(session, semaphore, url, resource_type, timeout)
+                                      for url, resource_type in resources))
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        return await asyncio.gather(*(measure_resource(session, semaphore, url, resource_type, timeout)
+                                      for url, resource_type in resources))
+
+def summarize_page_weight(measured):
+    """Totals, per-type breakdown, cacheability and the largest offenders for measured resources"""
+    ok = [resource for resource in measured if "error" not in resource and resource["status"] < 400]
+    sized = [resource for resource in ok if resource["bytes"] is not None]
+
+    by_type = {}
+    for resource in ok:
+        entry = by_type.setdefault(resource["type"], {"count": 0, "bytes": 0, "uncompressed_bytes": 0})
+        entry["count"] += 1
+        entry["bytes"] += resource["bytes"] or 0
+        entry["uncompressed_bytes"] += resource["uncompressed_bytes"] or 0
+
+    total_bytes = sum(resource["bytes"] for resource in sized)
+    uncompressed_bytes = sum(resource["uncompressed_bytes"] or resource["bytes"] for resource in sized)
+    uncacheable = [resource for resource in ok if not resource["cacheable"]]
+    uncompressed_text = [resource for resource in ok if resource["type"] in COMPRESSIBLE_TYPES
+                         and resource["content_encoding"] == 'identity']
+    large_images = [resource for resource in sized if resource["type"] == 'image'
+                    and resource["bytes"] > LARGE_IMAGE_LIMIT]
+    failed = len(measured) - len(ok)
+
+    issues = []
+    if total_bytes > PAGE_WEIGHT_LIMIT:
+        issues.append(f"Page resources total {total_bytes / 1024 / 1024:.1f} MB (over 3 MB)")
+    if uncompressed_text:
+        issues.append(f"{len(uncompressed_text)} scripts/stylesheets served without compression")
+    if uncacheable:
+        issues.append(f"{len(uncacheable)} resources have no cache lifetime (Cache-Control max-age or Expires)")
+    if large_images:
+        issues.append(f"{len(large_images)} images larger than 500 KB")
+    if failed:
+        issues.append(f"{failed} resources failed to load")
+
+    largest = sorted(sized, key=lambda resource: resource["bytes"], reverse=True)[:LARGEST_COUNT]
+    return {
+        "resource_count": len(measured),
+        "total_bytes": total_bytes,
+        "uncompressed_bytes": uncompressed_bytes,
+        "by_type": by_type,
+        "uncacheable_count": len(uncacheable),
+        "failed_count": failed,
+        "largest": [{key: resource[key] for key in ("url", "type", "bytes", "uncompressed_bytes",
+                                                    "content_encoding", "cache_control", "cacheable")}
+                    for resource in largest],
+        "issues": issues,
+    }
+
+async def measure_page_weight_async(facts, page_url, session=None, concurrency=16, timeout=10):
+    """Collect a parsed page's subresources and measure their weight and cacheability from headers alone"""
+    resources = collect_resources(facts, page_url)
+    measured = await fetch_resource_headers(resources, session, concurrency, timeout) if resources else []
+    return summarize_page_weight(measured)
+
+def run_sync(coroutine):
+    """Run a coroutine from synchronous code, in a worker thread when this thread already runs an event loop"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+def measure_page_weight(facts, page_url, concurrency=16, timeout=10):
+    """Blocking ``measure_page_weight_async``, callable from inside a running event loop too"""
+    return run_sync(measure_page_weight_async(facts, page_url, concurrency=concurrency, timeout=timeout))
@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+
+THROTTLE_STATUSES = (429, 503)
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class HostState:
+    __slots__ = ('next_time', 'latency', 'crawl_delay', 'backoff')
+
+    def __init__(self):
+        self.next_time = 0.0
+        self.latency = None
+        self.crawl_delay = 0.0
+        self.backoff = 0.0
+
+class HostScheduler:
+    """Adaptive per-host request pacing.
+
+    Each host gets its own interval between request starts, derived from:
+      - the measured response latency (an EWMA divided by ``target_concurrency``,
+        so a fast server is only paced as much as it can comfortably absorb),
+      - the robots.txt Crawl-delay for the host,
+      - an exponential backoff raised on 429/503 (honouring Retry-After) that
+        decays again on successful responses,
+    never going below ``min_delay`` or above ``max_delay``.
+    """
+
+    def __init__(self, min_delay=0.0, max_delay=60.0, target_concurrency=4.0,
+                 smoothing=0.3, backoff_base=1.0, recovery=0.5):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.target_concurrency = target_concurrency
+        self.smoothing = smoothing
+        self.backoff_base = backoff_base
+        self.recovery = recovery
+        self.hosts = {}
+        self._lock = threading.Lock()
+
+    def _state(self, host):
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = HostState()
+        return state
+
+    def set_crawl_delay(self, host, seconds):
+        """Apply a robots.txt Crawl-delay directive for the host"""
+        with self._lock:
+            self._state(host).crawl_delay = float(seconds or 0)
+
+    def delay_for(self, host):
+        """Current interval between request starts for the host"""
+        state = self._state(host)
+        latency_delay = (state.latency or 0.0) / self.target_concurrency
+        delay = max(self.min_delay, state.crawl_delay, latency_delay, state.backoff)
+        return min(delay, self.max_delay)
+
+    def reserve(self, host):
+        """Claim the host's next request slot and return how long to wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(host)
+            start = max(now, state.next_time)
+            state.next_time = start + self.delay_for(host)
+            return start - now
+
+    def wait_sync(self, host):
+        time.sleep(self.reserve(host))
+
+    async def wait(self, host):
+        await asyncio.sleep(self.reserve(host))
+
+    def record(self, host, latency=None, status=None, retry_after=None):
+        """Feed back the outcome of a request to the host"""
+        with self._lock:
+            state = self._state(host)
+
+            if status in THROTTLE_STATUSES:
+                backoff = max(state.backoff * 2, self.backoff_base)
+                retry_after = parse_retry_after(retry_after) if isinstance(retry_after, str) else retry_after
+                if retry_after:
+                    backoff = max(backoff, retry_after)
+                state.backoff = min(backoff, self.max_delay)
+                # Hold back every queued request for the host, not only the next one
+                state.next_time = max(state.next_time, time.monotonic() + state.backoff)
+                return
+
+            if latency is not None:
+                if state.latency is None:
+                    state.latency = latency
+                else:
+                    state.latency += self.smoothing * (latency - state.latency)
+
+            if state.backoff:
+                state.backoff *= self.recovery
+                if state.backoff < self.min_delay or state.backoff < 0.01:
+                    state.backoff = 0.0
+
+class PacedSession:
+    """``requests``-style session whose GETs wait for the host's slot and report back to the scheduler"""
+
+    def __init__(self, scheduler, session=None):
+        self.scheduler = scheduler
+        self.session = session or requests.Session()
+
+    def get(self, url, **kwargs):
+        host = urlparse(url).netloc
+        self.scheduler.wait_sync(host)
+        response = self.session.get(url, **kwargs)
+        self.scheduler.record(host, response.elapsed.total_seconds(), response.status_code,
+                              response.headers.get('Retry-After'))
+        return response
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,187 @@
+import re
+import threading
+import time
+from urllib.parse import unquote, urlparse
+
+import requests
+
+from httpcache import resolve_cache
+from sqlitestore import SharedDefault
+
+DEFAULT_ROBOTS_TTL = 3600
+
+def rule_pattern(path):
+    """Compile a robots.txt path rule; '*' matches any run of characters and a trailing '$' anchors the end"""
+    anchored = path.endswith('$')
+    if anchored:
+        path = path[:-1]
+    if '*' not in path and not anchored:
+        return None
+    regex = '.*'.join(re.escape(part) for part in path.split('*'))
+    return re.compile(regex + ('$' if anchored else ''))
+
+def normalize_path(path):
+    """Decode percent-escapes except an encoded '/', so rule and URL paths compare alike"""
+    return unquote(path.replace('%2F', '%252F').replace('%2f', '%252f'))
+
+class RobotsRules:
+    """The robots.txt rules that apply to one site, compiled once for fast matching.
+
+    Rules are checked longest first, with Allow winning ties, as major search
+    engines do; plain prefixes are matched with ``str.startswith``.
+    """
+
+    __slots__ = ('exists', 'rules', 'crawl_delay', 'sitemaps', 'fetched_at')
+
+    def __init__(self, exists=False, rules=(), crawl_delay=None, sitemaps=(), fetched_at=0.0):
+        self.exists = exists
+        # (path, allow, compiled pattern or None for a plain prefix), longest path first
+        self.rules = sorted(rules, key=lambda rule: (-len(rule[0]), not rule[1]))
+        self.crawl_delay = crawl_delay
+        self.sitemaps = list(sitemaps)
+        self.fetched_at = fetched_at
+
+    @classmethod
+    def allow_all(cls, exists=False):
+        return cls(exists, fetched_at=time.time())
+
+    @classmethod
+    def disallow_all(cls):
+        return cls(False, [('/', False, None)], fetched_at=time.time())
+
+    def allowed(self, url):
+        """Whether the URL (or a bare path) may be fetched"""
+        if not self.rules:
+            return True
+        parsed_url = urlparse(url)
+        path = normalize_path(parsed_url.path or '/')
+        if parsed_url.query:
+            path += '?' + parsed_url.query
+
+        for rule_path, allow, pattern in self.rules:
+            if pattern is None:
+                if path.startswith(rule_path):
+                    return allow
+            elif pattern.match(path):
+                return allow
+        return True
+
+def parse_robots(text, user_agent='*'):
+    """Parse robots.txt text into the ``RobotsRules`` for ``user_agent``.
+
+    The most specific group naming the agent is used, falling back to the '*' group.
+    """
+    agent = user_agent.lower()
+    groups = {}
+    sitemaps = []
+    current_agents = []
+    in_agent_lines = False
+
+    for line in text.splitlines():
+        line = line.split('#', 1)[0].strip()
+        if ':' not in line:
+            continue
+        field, value = line.split(':', 1)
+        field = field.strip().lower()
+        value = value.strip()
+
+        if field == 'user-agent':
+            if not in_agent_lines:
+                current_agents = []
+                in_agent_lines = True
+            current_agents.append(value.lower())
+            groups.setdefault(value.lower(), {'rules': [], 'crawl_delay': None})
+            continue
+
+        in_agent_lines = False
+        if field == 'sitemap':
+            sitemaps.append(value)
+        elif field in ('allow', 'disallow'):
+            # An empty Disallow allows everything and adds no rule
+            if value:
+                path = normalize_path(value)
+                for name in current_agents:
+                    groups[name]['rules'].append((path, field == 'allow', rule_pattern(path)))
+        elif field == 'crawl-delay':
+            try:
+                delay = float(value)
+            except ValueError:
+                continue
+            for name in current_agents:
+                groups[name]['crawl_delay'] = delay
+
+    matching = [name for name in groups if name != '*' and name in agent]
+    if matching:
+        group = groups[max(matching, key=len)]
+    else:
+        group = groups.get('*', {'rules': [], 'crawl_delay': None})
+
+    return RobotsRules(True, group['rules'], group['crawl_delay'], sitemaps, time.time())
+
+class RobotsCache:
+    """robots.txt per site (scheme + host), fetched once and kept for ``ttl`` seconds.
+
+    The crawler uses it to skip disallowed URLs and pick up Crawl-delay, and the
+    analyzer for its robots.txt check, so a whole crawl or site audit costs one
+    robots.txt request per site. Downloads go through the shared HTTP cache
+    (``cache=False`` disables it), which also shares them between audit workers.
+    """
+
+    def __init__(self, ttl=DEFAULT_ROBOTS_TTL, user_agent='*', cache=None, timeout=5):
+        self.ttl = ttl
+        self.user_agent = user_agent
+        self.cache = resolve_cache(cache)
+        self.timeout = timeout
+        self.sites = {}
+        self._lock = threading.Lock()
+
+    def site_key(self, url):
+        parsed_url = urlparse(url)
+        return f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+    def fetch(self, site):
+        """Download and parse a site's robots.txt"""
+        robots_url = f"{site}/robots.txt"
+        try:
+            if self.cache is not None:
+                response = self.cache.fetch(robots_url, timeout=self.timeout)
+            else:
+                response = requests.get(robots_url, timeout=self.timeout)
+        except requests.exceptions.RequestException:
+            return RobotsRules.allow_all()
+
+        if response.status_code in (401, 403):
+            return RobotsRules.disallow_all()
+        if response.status_code != 200:
+            return RobotsRules.allow_all()
+        return parse_robots(response.text, self.user_agent)
+
+    def rules_for(self, url):
+        """The cached ``RobotsRules`` for the URL's site, fetching them if missing or expired"""
+        site = self.site_key(url)
+        with self._lock:
+            rules = self.sites.get(site)
+        if rules is None or time.time() - rules.fetched_at > self.ttl:
+            rules = self.fetch(site)
+            with self._lock:
+                self.sites[site] = rules
+        return rules
+
+    def allowed(self, url):
+        return self.rules_for(url).allowed(url)
+
+    def crawl_delay(self, url):
+        return self.rules_for(url).crawl_delay
+
+    def has_robots_txt(self, url):
+        return self.rules_for(url).exists
+
+_default_robots = SharedDefault(RobotsCache)
+
+def get_default_robots():
+    """The process-wide robots.txt cache shared by the crawler and the analyzer"""
+    return _default_robots.get()
+
+def resolve_robots(robots):
+    """Map a ``robots`` argument: None means the shared cache, False ignores robots.txt"""
+    return _default_robots.resolve(robots)
@@ -1,25 +1,45 @@
-import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urlparse
 import re
 import datetime
-import ssl
-import socket
-import time
 import html
-from collections import Counter
+
+from httpcache import DEFAULT_MAX_BODY_BYTES, resolve_cache
+from robots import resolve_robots
+from domainprobe import get_default_probes, probe_http2
+from netprobe import timed_fetch
+from pageweight import measure_page_weight
+from ngrams import NgramStats
+from keywordzones import KeywordZoneIndex, ZONE_LABELS
+from textstats import page_readability
+from domfacts import collect_dom_facts, SEMANTIC_TAGS, HTML5_TAGS
+from htmlparser import make_soup
 
 class SEOAnalyzer:
-    def __init__(self, url):
+    def __init__(self, url, cache=None, parser=None, max_body_bytes=DEFAULT_MAX_BODY_BYTES, robots=None,
+                 probes=None, measure_weight=True):
         self.url = url
         self.domain = urlparse(url).netloc
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/100.0.4896.127 Safari/537.36'
         }
+        # Shared on-disk HTTP cache (None = default cache, False = always hit the network)
+        self.cache = resolve_cache(cache)
+        # HTML parser backend (None = $ASTUTE_HTML_PARSER or 'html.parser', see htmlparser.py)
+        self.parser = parser
+        # Uncached fetches are streamed and abandoned past this size (cached ones use the cache's limit)
+        self.max_body_bytes = max_body_bytes
+        # robots.txt is fetched once per site and shared with the crawler (see robots.py); False skips the check
+        self.robots = resolve_robots(robots)
+        # Domain-wide checks (sitemap.xml, HTTP/2) run once per site (see domainprobe.py)
+        self.probes = probes or get_default_probes()
+        # HEAD the page's scripts, stylesheets, images and fonts for results["performance"]["page_weight"]
+        self.measure_weight = measure_weight
         self.response = None
         self.soup = None
+        self.facts = None
         self.text_content = ""
         self.word_count = 0
+        self.ngrams = None
         self.results = {
             "general_info": {},
             "on_page": {},
@@ -30,6 +50,19 @@ class SEOAnalyzer:
             "content": {}
         }
 
+    @classmethod
+    def from_response(cls, response, url=None, cache=None, parser=None, robots=None, probes=None,
+                      measure_weight=True):
+        """Create an analyzer for a page that has already been fetched (e.g. by the crawler).
+
+        The response's body, headers and timing (if it carries one) are used
+        as-is, so ``analyze`` does no network fetch for the page itself.
+        """
+        analyzer = cls(url or response.url, cache=cache, parser=parser, robots=robots, probes=probes,
+                       measure_weight=measure_weight)
+        analyzer.response = response
+        return analyzer
+
     def analyze(self):
         """Run all analysis methods and return the results"""
         try:
@@ -37,28 +70,61 @@ class SEOAnalyzer:
             self.get_general_info()
             self.analyze_on_page_factors()
             self.analyze_technical_factors()
+            if self.measure_weight:
+                self.analyze_page_weight()
             self.analyze_semantics()
             self.analyze_text_content()
             return self.results
         except Exception as e:
             return {"error": str(e)}
 
+    def fetch_timed(self, url, timeout=10):
+        """GET a page with a network timing breakdown, through the HTTP cache when one is configured.
+
+        Fresh cached copies are returned without a request, with the timing of the download that stored them.
+        """
+        cached = None
+        request_headers = self.headers
+        if self.cache is not None:
+            cached, age = self.cache.get(url)
+            if cached is not None:
+                if self.cache.is_fresh(age, cached):
+                    return cached
+                request_headers = self.cache.conditional_headers(url, self.headers)
+
+        response = timed_fetch(url, request_headers, timeout, max_bytes=self.max_body_bytes)
+        if response.status_code == 304 and cached is not None:
+            self.cache.touch(url)
+            cached.timing = response.timing
+            return cached
+
+        if self.cache is not None:
+            self.cache.store(url, response)
+        return response
+
     def fetch_page(self):
-        """Fetch the webpage and prepare BeautifulSoup object"""
-        start_time = time.time()
-        self.response = requests.get(self.url, headers=self.headers, timeout=10)
-        load_time = time.time() - start_time
+        """Fetch the webpage (unless a response was handed in) and prepare BeautifulSoup object"""
+        if self.response is None:
+            self.response = self.fetch_timed(self.url)
+
+        # For cached pages, the load time measured when the page was actually downloaded
+        load_time = self.response.elapsed
+        if hasattr(load_time, 'total_seconds'):
+            load_time = load_time.total_seconds()
 
-        self.soup = BeautifulSoup(self.response.text, 'html.parser')
+        self.soup = make_soup(self.response.text, self.parser)
 
-        # Extract visible text
-        for script in self.soup(["script", "style"]):
-            script.extract()
+        # One walk over the tree collects everything the analysis methods read, including the visible text
+        self.facts = collect_dom_facts(self.soup)
 
-        self.text_content = self.soup.get_text(separator=" ", strip=True)
+        self.text_content = self.facts.text
         self.word_count = len(self.text_content.split())
+        # One tokenization shared by the keyword and phrase analyses
+        self.ngrams = NgramStats(self.text_content)
 
         self.results["performance"]["load_time"] = round(load_time, 2)
+        # Only pages downloaded by ``timed_fetch`` carry a breakdown; cached and crawled pages report none
+        self.results["performance"]["timing"] = getattr(self.response, 'timing', None)
 
     def get_general_info(self):
         """Get general information about the website"""
@@ -71,20 +137,21 @@ class SEOAnalyzer:
     def analyze_on_page_factors(self):
         """Analyze on-page SEO factors"""
         # Title tag
-        title = self.soup.title.string if self.soup.title else ""
+        facts = self.facts
+        title = facts.title
         title_length = len(title) if title else 0
         title_word_count = len(title.split()) if title else 0
 
         # Meta description
         meta_desc = ""
-        meta_desc_tag = self.soup.find("meta", attrs={"name": "description"})
+        meta_desc_tag = facts.meta_description
         if meta_desc_tag:
             meta_desc = meta_desc_tag.get("content", "")
         meta_desc_length = len(meta_desc) if meta_desc else 0
         meta_desc_word_count = len(meta_desc.split()) if meta_desc else 0
 
         # Links analysis
-        all_links = self.soup.find_all("a", href=True)
+        all_links = facts.anchors
         internal_links = [link for link in all_links if self.is_internal_link(link.get("href"))]
         external_links = [link for link in all_links if not self.is_internal_link(link.get("href"))]
         links_without_title = [link for link in all_links if not link.get("title")]
@@ -92,23 +159,20 @@ class SEOAnalyzer:
         nofollow_links = [link for link in all_links if link.get("rel") and "nofollow" in link.get("rel")]
 
         # Images analysis
-        images = self.soup.find_all("img")
+        images = facts.images
         images_without_alt = [img for img in images if not img.get("alt")]
         images_without_title = [img for img in images if not img.get("title")]
 
         # Headings analysis
-        h1_tags = self.soup.find_all("h1")
-        h2_tags = self.soup.find_all("h2")
-        h3_tags = self.soup.find_all("h3")
+        h1_tags = facts.headings["h1"]
+        h2_tags = facts.headings["h2"]
+        h3_tags = facts.headings["h3"]
 
         # Create heading structure
         heading_structure = []
-        for h1 in h1_tags:
-            heading_structure.append({"tag": "h1", "text": h1.text.strip()})
-        for h2 in h2_tags:
-            heading_structure.append({"tag": "h2", "text": h2.text.strip()})
-        for h3 in h3_tags:
-            heading_structure.append({"tag": "h3", "text": h3.text.strip()})
+        for tag in ("h1", "h2", "h3"):
+            for text in facts.heading_texts(tag):
+                heading_structure.append({"tag": tag, "text": text})
 
         self.results["on_page"] = {
             "title": {
@@ -193,30 +257,21 @@ class SEOAnalyzer:
     def analyze_technical_factors(self):
         """Analyze technical SEO factors"""
         # Check for robots.txt
-        has_robots_txt = False
-        try:
-            robots_url = f"{urlparse(self.url).scheme}://{self.domain}/robots.txt"
-            robots_response = requests.get(robots_url, headers=self.headers, timeout=5)
-            has_robots_txt = robots_response.status_code == 200
-        except:
-            pass
-
-        # Check for sitemap.xml
-        has_sitemap = False
-        try:
-            sitemap_url = f"{urlparse(self.url).scheme}://{self.domain}/sitemap.xml"
-            sitemap_response = requests.get(sitemap_url, headers=self.headers, timeout=5)
-            has_sitemap = sitemap_response.status_code == 200
-        except:
-            pass
+        has_robots_txt = self.robots.has_robots_txt(self.url) if self.robots is not None else None
+
+        # Check for sitemap.xml (and HTTP/2 and HTTP/3 support below), memoized per site
+        domain_probes = self.probes.probe(self.url)
+        has_sitemap = domain_probes["sitemap_xml"]
+
+        facts = self.facts
 
         # Check for canonical tag
-        canonical_tag = self.soup.find("link", attrs={"rel": "canonical"})
+        canonical_tag = facts.canonical
         has_canonical = canonical_tag is not None
         canonical_url = canonical_tag.get("href") if canonical_tag else ""
 
         # Check for robots meta tag
-        robots_meta = self.soup.find("meta", attrs={"name": "robots"})
+        robots_meta = facts.meta_robots
         has_robots_meta = robots_meta is not None
         robots_content = robots_meta.get("content") if robots_meta else ""
 
@@ -224,34 +279,30 @@ class SEOAnalyzer:
         doctype = self.get_doctype()
         has_html5_doctype = "html" in doctype.lower() if doctype else False
 
-        # Check HTTP/2 support
-        http2_supported = self.check_http2_support()
+        # Check HTTP/2 (ALPN) and HTTP/3 (Alt-Svc) support
+        http2_supported = domain_probes["http2_support"]
+        protocols = domain_probes["protocols"]
 
         # Check responsive design
-        viewport_meta = self.soup.find("meta", attrs={"name": "viewport"})
+        viewport_meta = facts.meta_viewport
         has_responsive_design = viewport_meta is not None
 
         # Check for Open Graph tags
-        og_tags = self.soup.find_all("meta", attrs={"property": re.compile("^og:")})
-        has_og_tags = len(og_tags) > 0
+        has_og_tags = facts.og_tag_count > 0
 
         # Check for Twitter Card tags
-        twitter_tags = self.soup.find_all("meta", attrs={"name": re.compile("^twitter:")})
-        has_twitter_cards = len(twitter_tags) > 0
+        has_twitter_cards = facts.twitter_tag_count > 0
 
         # Check for schema.org / structured data
         has_structured_data = "application/ld+json" in self.response.text
 
         # Check for inline CSS/JS
-        style_tags = self.soup.find_all("style")
-        inline_styles = len(style_tags)
-
-        script_tags = self.soup.find_all("script")
-        inline_scripts = len([s for s in script_tags if not s.get("src")])
-        external_scripts = len([s for s in script_tags if s.get("src")])
+        inline_styles = facts.count("style")
+        inline_scripts = facts.inline_scripts
+        external_scripts = facts.external_scripts
 
         # Frames check
-        frames = self.soup.find_all(["frame", "iframe"])
+        frame_count = facts.count("frame") + facts.count("iframe")
 
         # Calculate code to text ratio
         code_size = len(self.response.text.encode('utf-8'))
@@ -271,6 +322,13 @@ class SEOAnalyzer:
             },
             "html5_doctype": has_html5_doctype,
             "http2_support": http2_supported,
+            "http3_support": domain_probes["http3_support"],
+            "protocols": {
+                "alpn": protocols["alpn"],
+                "tls_version": protocols["tls_version"],
+                "tls_handshake_ms": protocols["tls_handshake_ms"],
+                "alt_svc": protocols["alt_svc"]
+            },
             "responsive_design": has_responsive_design,
             "open_graph": has_og_tags,
             "twitter_cards": has_twitter_cards,
@@ -281,7 +339,7 @@ class SEOAnalyzer:
                 "external_scripts": external_scripts,
                 "issues": []
             },
-            "frames": len(frames),
+            "frames": frame_count,
             "code_text_ratio": {
                 "code_size": code_size,
                 "text_size": text_size,
@@ -291,7 +349,7 @@ class SEOAnalyzer:
         }
 
         # Check for issues
-        if not has_robots_txt:
+        if has_robots_txt is False:
             self.results["technical"]["issues"] = self.results["technical"].get("issues", [])
             self.results["technical"]["issues"].append("No robots.txt found")
 
@@ -312,153 +370,66 @@ class SEOAnalyzer:
         if external_scripts > 15:
             self.results["technical"]["css_js"]["issues"].append(f"Too many external scripts ({external_scripts})")
 
-        if len(frames) > 0:
+        if frame_count > 0:
             self.results["technical"]["issues"] = self.results["technical"].get("issues", [])
-            self.results["technical"]["issues"].append(f"Found {len(frames)} frames or iframes")
+            self.results["technical"]["issues"].append(f"Found {frame_count} frames or iframes")
 
         if text_ratio < 25:
             self.results["technical"]["code_text_ratio"]["issues"].append("Text rate should be higher than 25%")
 
+    def analyze_page_weight(self):
+        """Measure the size and cacheability of the page's subresources from their response headers"""
+        self.results["performance"]["page_weight"] = measure_page_weight(self.facts, self.response.url)
+
     def analyze_semantics(self):
         """Analyze semantic factors including keyword usage and readability"""
-        # Get words and calculate frequencies
-        words = re.findall(r'\b[a-zA-Z]{3,}\b', self.text_content.lower())
-        word_freq = Counter(words)
+        # Word frequencies and the top 10 words (excluding common English stopwords)
+        total_words = self.ngrams.total
+        top_words = self.ngrams.top_keywords(10)
 
-        # Get top 10 words (excluding common English stopwords)
-        stopwords = ['the', 'and', 'are', 'for', 'was', 'not', 'you', 'but', 'his', 'her', 'they', 'she', 'will', 'with', 'from', 'that', 'this', 'have', 'has']
-        top_words = [word for word, count in word_freq.most_common(30) if word not in stopwords][:10]
+        # Tokenize each placement zone once; every keyword lookup is then a set probe per zone
+        zone_index = KeywordZoneIndex.from_facts(self.facts, self.url)
 
         # Calculate keyword density for top words
         top_words_data = []
         for word in top_words:
-            count = word_freq[word]
-            density = round((count / len(words) * 100), 2) if len(words) > 0 else 0
-
-            # Find where it appears
-            in_title = word in self.soup.title.string.lower() if self.soup.title else False
-            in_headings = any(word in h.text.lower() for h in self.soup.find_all(['h1', 'h2', 'h3']))
-            in_meta_desc = False
-            meta_desc_tag = self.soup.find("meta", attrs={"name": "description"})
-            if meta_desc_tag and meta_desc_tag.get("content"):
-                in_meta_desc = word in meta_desc_tag.get("content").lower()
-
-            # Visibility score - simple algorithm based on where keyword appears
-            visibility = 0
-            if in_title:
-                visibility += 20
-            if in_headings:
-                visibility += 15
-            if in_meta_desc:
-                visibility += 10
-            visibility += min(density * 10, 30)  # Weight by density up to 30%
+            count = self.ngrams.count(word)
+            density = round((count / total_words * 100), 2) if total_words > 0 else 0
+
+            # Find where it appears (whole-word matches) and weight the placements
+            zones = zone_index.zones_for(word)
 
             top_words_data.append({
                 "keyword": word,
                 "count": count,
                 "density": density,
-                "in_title": in_title,
-                "in_headings": in_headings,
-                "in_meta_desc": in_meta_desc,
-                "visibility": visibility
+                "in_title": "title" in zones,
+                "in_headings": "h1" in zones or "headings" in zones,
+                "in_meta_desc": "meta_description" in zones,
+                "zones": zones,
+                "visibility": zone_index.visibility(word, density, zones)
             })
 
-        # Calculate readability (basic Flesch Reading Ease)
-        word_count = len(re.findall(r'\b\w+\b', self.text_content))
-        sentence_count = len(re.findall(r'[.!?]+', self.text_content)) or 1
-        avg_words_per_sentence = word_count / sentence_count
-
-        # Very basic approximation of syllables
-        syllable_pattern = re.compile(r'[aeiouy]+', re.IGNORECASE)
-        syllables = len(syllable_pattern.findall(self.text_content))
-        syllables_per_word = syllables / word_count if word_count > 0 else 0
-
-        # Flesch Reading Ease formula: 206.835 - 1.015 × (words/sentences) - 84.6 × (syllables/words)
-        flesch_score = 206.835 - (1.015 * avg_words_per_sentence) - (84.6 * syllables_per_word)
-        flesch_score = max(0, min(100, round(flesch_score)))
-
-        # Interpret readability score
-        readability_level = "Unknown"
-        if flesch_score >= 90:
-            readability_level = "Very Easy"
-        elif flesch_score >= 80:
-            readability_level = "Easy"
-        elif flesch_score >= 70:
-            readability_level = "Fairly Easy"
-        elif flesch_score >= 60:
-            readability_level = "Standard"
-        elif flesch_score >= 50:
-            readability_level = "Fairly Difficult"
-        elif flesch_score >= 30:
-            readability_level = "Difficult"
-        else:
-            readability_level = "Very Difficult"
+        # Readability of the whole text and of each paragraph, in one vectorized pass (see textstats.py)
+        readability = page_readability(self.text_content, self.facts.paragraphs)
 
         self.results["semantics"] = {
             "top_keywords": top_words_data,
-            "readability": {
-                "flesch_score": flesch_score,
-                "level": readability_level,
-                "words_per_sentence": round(avg_words_per_sentence, 1),
-                "syllables_per_word": round(syllables_per_word, 2)
-            }
+            "readability": readability
         }
 
     def analyze_text_content(self):
         """Analyze text content and phrases"""
-        # Get all words
-        words = re.findall(r'\b[a-zA-Z]{3,}\b', self.text_content.lower())
-        word_freq = Counter(words)
-
-        # Get 2-word phrases
-        two_word_phrases = []
-        words_list = words
-        for i in range(len(words_list) - 1):
-            two_word_phrases.append(f"{words_list[i]} {words_list[i+1]}")
-        two_word_freq = Counter(two_word_phrases)
-
-        # Get 3-word phrases
-        three_word_phrases = []
-        for i in range(len(words_list) - 2):
-            three_word_phrases.append(f"{words_list[i]} {words_list[i+1]} {words_list[i+2]}")
-        three_word_freq = Counter(three_word_phrases)
-
-        # Get semantic tags
-        p_tags = self.soup.find_all("p")
-        strong_tags = self.soup.find_all("strong")
-        em_tags = self.soup.find_all("em")
-        ul_tags = self.soup.find_all("ul")
-        ol_tags = self.soup.find_all("ol")
-        blockquote_tags = self.soup.find_all("blockquote")
-
-        # HTML5 semantic elements
-        header_tags = self.soup.find_all("header")
-        footer_tags = self.soup.find_all("footer")
-        nav_tags = self.soup.find_all("nav")
-        article_tags = self.soup.find_all("article")
-        section_tags = self.soup.find_all("section")
-        aside_tags = self.soup.find_all("aside")
+        # Word, 2-word and 3-word phrase frequencies from the shared tokenization
+        ngrams = self.ngrams
 
         self.results["content"] = {
-            "word_frequencies": {word: count for word, count in word_freq.most_common(30)},
-            "two_word_phrases": {phrase: count for phrase, count in two_word_freq.most_common(20)},
-            "three_word_phrases": {phrase: count for phrase, count in three_word_freq.most_common(10)},
-            "semantic_tags": {
-                "p": len(p_tags),
-                "strong": len(strong_tags),
-                "em": len(em_tags),
-                "ul": len(ul_tags),
-                "ol": len(ol_tags),
-                "blockquote": len(blockquote_tags)
-            },
-            "html5_elements": {
-                "header": len(header_tags),
-                "footer": len(footer_tags),
-                "nav": len(nav_tags),
-                "article": len(article_tags),
-                "section": len(section_tags),
-                "aside": len(aside_tags)
-            }
+            "word_frequencies": dict(ngrams.most_common(30)),
+            "two_word_phrases": dict(ngrams.most_common(20, size=2)),
+            "three_word_phrases": dict(ngrams.most_common(10, size=3)),
+            # Semantic tags and HTML5 semantic elements, counted during the single tree walk
+            "semantic_tags": {tag: self.facts.count(tag) for tag in SEMANTIC_TAGS},
+            "html5_elements": {tag: self.facts.count(tag) for tag in HTML5_TAGS}
         }
 
     def is_internal_link(self, href):
@@ -479,20 +450,68 @@ class SEOAnalyzer:
         return doctype_match.group(0) if doctype_match else ""
 
     def check_http2_support(self):
-        """Check if the server supports HTTP/2"""
-        try:
-            parsed_url = urlparse(self.url)
-            host = parsed_url.netloc
-            port = 443 if parsed_url.scheme == 'https' else 80
-
-            context = ssl.create_default_context()
-            conn = socket.create_connection((host, port), timeout=10)
-            if parsed_url.scheme == 'https':
-                conn = context.wrap_socket(conn, server_hostname=host)
-
-            return conn.version() == 'h2'
-        except:
-            return False
+        """Check if the server supports HTTP/2 (uncached; ``analyze`` uses the domain probe cache)"""
+        return probe_http2(self.url)
+
+def format_timing(timing):
+    """Report lines for a ``netprobe.timed_fetch`` timing breakdown"""
+    if not timing:
+        return []
+    if "error" in timing:
+        return [f"Network Timing: unavailable ({timing['error']})"]
+
+    def ms(value):
+        return f"{value} ms" if value is not None else "n/a"
+
+    transfer = f"{timing['transfer_bytes']} bytes" if timing['transfer_bytes'] is not None else "unknown size"
+    lines = [
+        "Network Timing:",
+        f"  - DNS lookup: {ms(timing['dns_ms'])}",
+        f"  - TCP connect: {ms(timing['connect_ms'])}",
+        f"  - TLS handshake: {ms(timing['tls_ms'])}",
+        f"  - Time to first byte: {ms(timing['ttfb_ms'])}",
+        f"  - Download: {ms(timing['download_ms'])}",
+        f"  - Total: {ms(timing['total_ms'])}",
+        f"  - Transfer size: {transfer} ({timing['content_encoding']}), "
+        f"{timing['body_bytes']} bytes uncompressed",
+    ]
+    if timing['compression_ratio']:
+        lines.append(f"  - Compression ratio: {timing['compression_ratio']}x")
+    lines.append(f"  - Redirects: {timing['redirect_count']}")
+    for hop in timing['redirects']:
+        lines.append(f"    - {hop['status']} {hop['url']} ({hop['time_ms']} ms)")
+    return lines
+
+def format_size(size):
+    if size is None:
+        return "unknown size"
+    if size >= 1024 * 1024:
+        return f"{size / 1024 / 1024:.1f} MB"
+    return f"{size / 1024:.1f} KB"
+
+def format_page_weight(weight):
+    """Report lines for a ``pageweight.measure_page_weight`` summary"""
+    if not weight:
+        return []
+
+    lines = [
+        "Page Weight:",
+        f"  - Resources: {weight['resource_count']} ({weight['failed_count']} failed)",
+        f"  - Transfer size: {format_size(weight['total_bytes'])}, "
+        f"{format_size(weight['uncompressed_bytes'])} uncompressed",
+    ]
+    for resource_type, entry in sorted(weight['by_type'].items()):
+        lines.append(f"  - {resource_type.capitalize()}s: {entry['count']}, {format_size(entry['bytes'])}")
+    lines.append(f"  - Without cache lifetime: {weight['uncacheable_count']}")
+    if weight['largest']:
+        lines.append("  Largest resources:")
+        for resource in weight['largest']:
+            lines.append(f"    - {format_size(resource['bytes'])} {resource['type']}: {resource['url']}")
+    if weight['issues']:
+        lines.append("  Issues:")
+        for issue in weight['issues']:
+            lines.append(f"    - {issue}")
+    return lines
 
 def run_seo_analysis(url):
     analyzer = SEOAnalyzer(url)
@@ -589,6 +608,11 @@ def print_seo_report(results):
         print(f"  - Content: {tech_info['robots_meta']['content']}")
     print(f"HTML5 Doctype: {'Present' if tech_info['html5_doctype'] else 'Not found'}")
     print(f"HTTP/2 Support: {'Supported' if tech_info['http2_support'] else 'Not supported'}")
+    print(f"HTTP/3 Support: {'Advertised' if tech_info['http3_support'] else 'Not advertised'}")
+    protocols = tech_info['protocols']
+    if protocols['tls_version']:
+        print(f"  - Negotiated: {protocols['alpn'] or 'no ALPN'} over {protocols['tls_version']}, "
+              f"TLS handshake {protocols['tls_handshake_ms']} ms")
     print(f"Responsive Design: {'Detected' if tech_info['responsive_design'] else 'Not detected'}")
     print(f"Open Graph Tags: {'Present' if tech_info['open_graph'] else 'Not found'}")
     print(f"Twitter Cards: {'Present' if tech_info['twitter_cards'] else 'Not found'}")
@@ -626,13 +650,7 @@ def print_seo_report(results):
     print("\nTop Keywords:")
     for keyword in semantic_info['top_keywords']:
         print(f"  - {keyword['keyword']}: {keyword['count']} occurrences, {keyword['density']}% density, {keyword['visibility']} visibility score")
-        locations = []
-        if keyword['in_title']:
-            locations.append("Title")
-        if keyword['in_headings']:
-            locations.append("Headings")
-        if keyword['in_meta_desc']:
-            locations.append("Meta Description")
+        locations = [ZONE_LABELS[zone] for zone in keyword['zones']]
         if locations:
             print(f"    Appears in: {', '.join(locations)}")
 
@@ -642,6 +660,9 @@ def print_seo_report(results):
     print(f"  - Readability Level: {read_info['level']}")
     print(f"  - Average Words Per Sentence: {read_info['words_per_sentence']}")
     print(f"  - Average Syllables Per Word: {read_info['syllables_per_word']}")
+    print(f"  - Long Sentences (over 20 words): {read_info['long_sentence_ratio']:.0%}")
+    print(f"  - Passive Voice Sentences: {read_info['passive_voice_ratio']:.0%}")
+    print(f"  - Hard-to-Read Sentences: {read_info['hard_sentence_ratio']:.0%}")
 
     # Content analysis
     print("\n" + "-"*50)
@@ -688,4 +709,8 @@ def print_seo_report(results):
 
         perf_info = results['performance']
         print(f"\nPage Load Time: {perf_info['load_time']} seconds")
+        for line in format_timing(perf_info.get('timing')):
+            print(line)
+        for line in format_page_weight(perf_info.get('page_weight')):
+            print(line)
 
@@ -0,0 +1,175 @@
+import asyncio
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import aiohttp
+
+from auditstore import content_hash
+from Crawler import fetch_html, is_html
+from httpcache import resolve_cache
+from netprobe import timing_trace_config
+from politeness import HostScheduler
+from seocheck import SEOAnalyzer
+
+def audit_analyzer(url, response):
+    # Page weight costs extra requests per page; audits report the fetch's load time only
+    return SEOAnalyzer.from_response(response, url=url, measure_weight=False)
+
+def not_html_error(response):
+    return {"error": f"Not an HTML page ({response.headers.get('Content-Type', 'unknown type')})"}
+
+def analyze_response(url, response):
+    """Worker entry point: run the full SEO analysis on an already-fetched page"""
+    if not is_html(response):
+        return not_html_error(response)
+    return audit_analyzer(url, response).analyze()
+
+def analyze_and_count_terms(url, response):
+    """Worker entry point for indexed audits: the analysis results plus the page's ``(terms, counts)``"""
+    if not is_html(response):
+        return not_html_error(response), ([], [])
+    analyzer = audit_analyzer(url, response)
+    results = analyzer.analyze()
+    if analyzer.ngrams is None:
+        return results, ([], [])
+    return results, analyzer.ngrams.term_counts()
+
+def count_issues(results):
+    """Total number of issues reported across all sections of a result dict"""
+    total = 0
+    stack = [results]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key == "issues" and isinstance(value, list):
+                    total += len(value)
+                else:
+                    stack.append(value)
+    return total
+
+# pagefacts.AuditTable columns shown for a finished site audit (the columnar form of ``summarize_results``)
+SUMMARY_COLUMNS = ("title", "word_count", "h1_count", "flesch_score", "long_sentence_ratio", "passive_voice_ratio",
+                   "load_time", "error")
+
+def summarize_results(url, results):
+    """One flat row per page for tabular display of a site audit"""
+    if "error" in results:
+        return {"url": url, "error": results["error"]}
+
+    return {
+        "url": url,
+        "title": results['on_page']['title']['text'],
+        "word_count": results['on_page']['text']['word_count'],
+        "h1_count": results['on_page']['headings']['h1_count'],
+        "flesch_score": results['semantics']['readability']['flesch_score'],
+        "long_sentences": results['semantics']['readability']['long_sentence_ratio'],
+        "passive_voice": results['semantics']['readability']['passive_voice_ratio'],
+        "load_time": results['performance']['load_time'],
+        "issues": count_issues(results),
+        "error": None,
+    }
+
+async def analyze_page(loop, executor, url, response, index=None, run=None):
+    """Results for a fetched page, reusing ``run``'s stored results when its content is unchanged"""
+    page_hash = content_hash(response) if run is not None else None
+    cached = run.lookup(url, page_hash, need_terms=index is not None) if run is not None else None
+    if cached is not None:
+        results, terms = cached
+        if index is not None:
+            index.add_results(url, results, *terms)
+        return results
+
+    terms = None
+    if index is None:
+        results = await loop.run_in_executor(executor, analyze_response, url, response)
+    else:
+        results, terms = await loop.run_in_executor(executor, analyze_and_count_terms, url, response)
+        index.add_results(url, results, *terms)
+    if run is not None:
+        run.record(url, page_hash, results, terms)
+    return results
+
+async def audit_pages(urls, executor, on_result, pages=None, fetch_concurrency=16, cache=None, max_pending=32,
+                      index=None, run=None):
+    """Fetch pages with async I/O and analyze them in ``executor``, reporting each result as it finishes.
+
+    With ``index`` (a ``SiteIndex``), every analyzed page is also added to it.
+    With ``run`` (an ``auditstore.AuditRun``), pages whose content is unchanged
+    since they were last stored are not analyzed again.
+    """
+    loop = asyncio.get_running_loop()
+    pages = pages or {}
+    scheduler = HostScheduler()
+    fetch_slots = asyncio.Semaphore(fetch_concurrency)
+    # Bound fetched-but-unanalyzed pages so memory stays flat on large sites
+    in_flight = asyncio.Semaphore(max_pending)
+    connector = aiohttp.TCPConnector(limit=fetch_concurrency)
+
+    async with aiohttp.ClientSession(connector=connector, trace_configs=[timing_trace_config()]) as session:
+        async def audit_one(url):
+            async with in_flight:
+                try:
+                    response = pages.get(url)
+                    if response is None:
+                        response = await fetch_html(session, fetch_slots, scheduler, url, cache=cache)
+                    results = await analyze_page(loop, executor, url, response, index, run)
+                except Exception as e:
+                    results = {"error": str(e)}
+                    if run is not None:
+                        run.record(url, None, results)
+            on_result(url, results)
+
+        await asyncio.gather(*(audit_one(url) for url in urls))
+
+def audit_site(urls, pages=None, max_workers=None, fetch_concurrency=16, cache=None, index=None, run=None):
+    """Run SEOAnalyzer over every URL, yielding ``(url, results)`` as each page completes.
+
+    Pages are fetched concurrently (reusing any responses in ``pages``, e.g.
+    collected from ``crawl_website(on_page=...)``) and the CPU-bound parsing and
+    analysis runs in a process pool, so throughput scales with cores.
+    Pass a ``siteindex.SiteIndex`` as ``index`` to build the site-wide term
+    index as pages complete; it is complete once the generator is exhausted.
+    Pass an ``auditstore.AuditRun`` as ``run`` to store every page's results and
+    skip analyzing pages whose body is unchanged since the last audit; the run
+    is finished (and can be diffed) once the generator is exhausted.
+    If the audit itself fails, its exception is raised after the pages already
+    completed have been yielded, and ``run`` is left unfinished so a partial
+    run never becomes the baseline of the next diff.
+    """
+    cache = resolve_cache(cache)
+    max_workers = max_workers or os.cpu_count() or 1
+    max_pending = fetch_concurrency + 2 * max_workers
+    results_queue = queue.Queue()
+    done = object()
+    failures = []
+
+    # Spawned workers avoid forking a process that already runs threads (e.g. Streamlit)
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+        def run_audit():
+            try:
+                asyncio.run(audit_pages(urls, executor, lambda url, results: results_queue.put((url, results)),
+                                        pages, fetch_concurrency, cache, max_pending, index, run))
+            except Exception as e:
+                failures.append(e)
+            finally:
+                results_queue.put(done)
+
+        thread = threading.Thread(target=run_audit, daemon=True)
+        thread.start()
+
+        while True:
+            item = results_queue.get()
+            if item is done:
+                break
+            yield item
+
+        thread.join()
+        if failures:
+            raise failures[0]
+        if run is not None:
+            run.finish()
@@ -0,0 +1,155 @@
+import math
+from array import array
+
+import numpy as np
+
+from ngrams import STOPWORDS
+
+# Terms on more than this share of pages are treated as site-wide stopwords
+MAX_DOCUMENT_FREQUENCY = 0.5
+# Below this many pages document frequency says little; fall back to ``ngrams.STOPWORDS``
+MIN_PAGES_FOR_SITE_STOPWORDS = 10
+MAX_TERM_COUNT = 65535
+
+def normalize_text(text):
+    return " ".join((text or "").lower().split())
+
+class SiteIndex:
+    """Inverted index of a whole site's pages, with TF-IDF weights, built incrementally.
+
+    Each page's term counts are appended as ``(term, page, count)`` postings to
+    three flat typed arrays (about 10 bytes per distinct term per page), so a
+    10k-page site stays in the tens of megabytes. Query-side structures (document
+    frequencies, IDF and a term-sorted CSR view of the postings) are built with
+    numpy on first use after pages were added. Pages should be added from a
+    single thread.
+    """
+
+    def __init__(self, max_df=MAX_DOCUMENT_FREQUENCY):
+        self.max_df = max_df
+        self.urls = []
+        self.titles = []
+        self.meta_descriptions = []
+        self.term_ids = {}
+        self.terms = []
+        self.page_lengths = array('I')
+        # Postings in page order; page_offsets[i]:page_offsets[i + 1] are page i's
+        self.posting_terms = array('I')
+        self.posting_pages = array('I')
+        self.posting_counts = array('H')
+        self.page_offsets = array('L', [0])
+        self._query = None
+
+    def __len__(self):
+        return len(self.urls)
+
+    def add_page(self, url, terms, counts, title="", meta_description=""):
+        """Index one page from parallel lists of its terms and their counts"""
+        page = len(self.urls)
+        self.urls.append(url)
+        self.titles.append(title or "")
+        self.meta_descriptions.append(meta_description or "")
+
+        term_ids = self.term_ids
+        for term in terms:
+            if term not in term_ids:
+                term_ids[term] = len(self.terms)
+                self.terms.append(term)
+
+        self.posting_terms.extend(term_ids[term] for term in terms)
+        self.posting_pages.extend([page] * len(terms))
+        self.posting_counts.extend(min(count, MAX_TERM_COUNT) for count in counts)
+        self.page_offsets.append(len(self.posting_terms))
+        self.page_lengths.append(sum(counts))
+        self._query = None
+
+    def add_results(self, url, results, terms, counts):
+        """Index a page from its ``SEOAnalyzer`` results and term counts"""
+        if "error" in results:
+            return
+        self.add_page(url, terms, counts, results['on_page']['title']['text'],
+                      results['on_page']['meta_description']['text'])
+
+    def query_arrays(self):
+        """numpy views for querying, rebuilt after pages were added"""
+        if self._query is None:
+            terms = np.frombuffer(self.posting_terms, dtype=np.uint32).astype(np.int64)
+            pages = np.frombuffer(self.posting_pages, dtype=np.uint32).astype(np.int64)
+            counts = np.frombuffer(self.posting_counts, dtype=np.uint16).astype(np.float64)
+            lengths = np.frombuffer(self.page_lengths, dtype=np.uint32).astype(np.float64)
+
+            document_frequency = np.bincount(terms, minlength=len(self.terms))
+            idf = np.log((1 + len(self.urls)) / (1 + document_frequency)) + 1
+            weights = counts / np.maximum(lengths[pages], 1) * idf[terms]
+
+            if len(self.urls) >= MIN_PAGES_FOR_SITE_STOPWORDS:
+                stopword = document_frequency > self.max_df * len(self.urls)
+            else:
+                stopword = np.zeros(len(self.terms), dtype=bool)
+                for term in STOPWORDS:
+                    if term in self.term_ids:
+                        stopword[self.term_ids[term]] = True
+
+            # Term-sorted CSR view of the postings for per-term lookups
+            by_term = np.argsort(terms, kind='stable')
+            term_offsets = np.concatenate(([0], np.cumsum(document_frequency)))
+
+            self._query = {
+                "terms": terms, "pages": pages, "weights": weights, "idf": idf,
+                "document_frequency": document_frequency, "stopword": stopword,
+                "by_term": by_term, "term_offsets": term_offsets,
+            }
+        return self._query
+
+    def page_top_terms(self, page, n=10):
+        """``(term, tf-idf weight)`` for a page's highest-weighted non-stopword terms"""
+        query = self.query_arrays()
+        start, end = self.page_offsets[page], self.page_offsets[page + 1]
+        terms = query["terms"][start:end]
+        weights = np.where(query["stopword"][terms], 0.0, query["weights"][start:end])
+        top = np.argsort(-weights, kind='stable')[:n]
+        return [(self.terms[terms[i]], round(float(weights[i]), 4)) for i in top if weights[i] > 0]
+
+    def search(self, term, n=20):
+        """Pages containing ``term``, highest TF-IDF first, as ``(url, weight)``"""
+        term_id = self.term_ids.get(term.lower())
+        if term_id is None:
+            return []
+        query = self.query_arrays()
+        postings = query["by_term"][query["term_offsets"][term_id]:query["term_offsets"][term_id + 1]]
+        weights = query["weights"][postings]
+        order = np.argsort(-weights, kind='stable')[:n]
+        return [(self.urls[query["pages"][postings[i]]], round(float(weights[i]), 4)) for i in order]
+
+    def duplicates(self, texts):
+        groups = {}
+        for page, text in enumerate(texts):
+            key = normalize_text(text)
+            if key:
+                groups.setdefault(key, []).append(self.urls[page])
+        return {text: urls for text, urls in groups.items() if len(urls) > 1}
+
+    def duplicate_titles(self):
+        """``{title: [urls]}`` for titles used by more than one page (case and whitespace ignored)"""
+        return self.duplicates(self.titles)
+
+    def duplicate_meta_descriptions(self):
+        return self.duplicates(self.meta_descriptions)
+
+    def cannibalization(self, top_n=5, min_pages=2, limit=50):
+        """Terms that several pages compete for, i.e. are among each page's ``top_n`` TF-IDF terms.
+
+        Returns ``[{"term", "pages": [(url, weight)], "page_count"}]``, the most
+        contested terms first.
+        """
+        competing = {}
+        for page in range(len(self.urls)):
+            for term, weight in self.page_top_terms(page, top_n):
+                competing.setdefault(term, []).append((self.urls[page], weight))
+
+        contested = [
+            {"term": term, "pages": sorted(pages, key=lambda page: -page[1]), "page_count": len(pages)}
+            for term, pages in competing.items() if len(pages) >= min_pages
+        ]
+        contested.sort(key=lambda entry: (-entry["page_count"], -math.fsum(weight for _, weight in entry["pages"])))
+        return contested[:limit]
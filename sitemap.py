@@ -0,0 +1,113 @@
+import zlib
+import xml.etree.ElementTree as ET
+from urllib.parse import urlparse
+
+import requests
+
+from robots import resolve_robots
+
+GZIP_MAGIC = b'\x1f\x8b'
+CHUNK_SIZE = 64 * 1024
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+# Sitemap elements, namespaced or (as some generators write them) not
+ENTRY_TAGS = {f'{{{SITEMAP_NS}}}url': 'url', f'{{{SITEMAP_NS}}}sitemap': 'sitemap', 'url': 'url', 'sitemap': 'sitemap'}
+LOC_TAGS = (f'{{{SITEMAP_NS}}}loc', 'loc')
+
+def iter_sitemap_entries(chunks):
+    """Incrementally parse sitemap XML bytes, yielding ('url' | 'sitemap', loc) pairs.
+
+    Handles plain and gzip-compressed input. Only a ``<loc>`` directly inside
+    ``<url>`` or ``<sitemap>`` counts, so extension elements such as
+    ``<image:loc>`` never replace a page's URL. Processed elements are discarded
+    as soon as they are read, so memory stays bounded however large the sitemap is.
+    """
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    decompressor = None
+    stack = []
+    loc = None
+    head = b''
+
+    def entries(data):
+        nonlocal loc
+        if data and decompressor is not None:
+            data = decompressor.decompress(data)
+        if data:
+            parser.feed(data)
+        for event, elem in parser.read_events():
+            if event == 'start':
+                stack.append(elem)
+                continue
+
+            stack.pop()
+            parent = stack[-1].tag if stack else None
+            if elem.tag in LOC_TAGS and parent in ENTRY_TAGS:
+                loc = (elem.text or '').strip()
+            elif elem.tag in ENTRY_TAGS and len(stack) == 1:
+                if loc:
+                    yield ENTRY_TAGS[elem.tag], loc
+                loc = None
+                stack[0].clear()
+
+    for chunk in chunks:
+        if head is not None:
+            # Sniff gzip from the first two bytes, however the body was split into chunks
+            head += chunk
+            if len(head) < len(GZIP_MAGIC):
+                continue
+            chunk, head = head, None
+            if chunk[:2] == GZIP_MAGIC:
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if chunk:
+            yield from entries(chunk)
+
+    if head:
+        yield from entries(head)
+    if decompressor is not None:
+        parser.feed(decompressor.flush())
+    parser.close()
+    yield from entries(b'')
+
+def discover_sitemaps(main_url, robots=None):
+    """Sitemap URLs listed in robots.txt, falling back to /sitemap.xml.
+
+    robots.txt is read through ``robots`` (the shared ``RobotsCache`` by
+    default), so a crawl that also checks its rules downloads it once;
+    ``robots=False`` ignores robots.txt and only tries /sitemap.xml.
+    """
+    robots = resolve_robots(robots)
+    parsed_url = urlparse(main_url)
+    sitemaps = list(robots.rules_for(main_url).sitemaps) if robots is not None else []
+    return sitemaps or [f"{parsed_url.scheme}://{parsed_url.netloc}/sitemap.xml"]
+
+def iter_sitemap_urls(sitemap_urls, session=None, timeout=10, max_sitemaps=1000):
+    """Yield page URLs from sitemaps, following sitemap indexes breadth-first.
+
+    Each sitemap is streamed from the network and parsed as it arrives.
+    """
+    session = session or requests.Session()
+    pending = list(sitemap_urls)
+    seen = set(pending)
+    fetched = 0
+
+    while pending and fetched < max_sitemaps:
+        sitemap_url = pending.pop(0)
+        fetched += 1
+
+        try:
+            with session.get(sitemap_url, timeout=timeout, stream=True) as response:
+                if response.status_code != 200:
+                    continue
+
+                for kind, loc in iter_sitemap_entries(response.iter_content(CHUNK_SIZE)):
+                    if kind == 'url':
+                        yield loc
+                    elif loc not in seen:
+                        seen.add(loc)
+                        pending.append(loc)
+        except (requests.exceptions.RequestException, ET.ParseError, zlib.error) as e:
+            print(f"  Error reading sitemap {sitemap_url}: {e}")
+
+def iter_site_urls(main_url, session=None, timeout=10, robots=None):
+    """Yield every page URL advertised by the site's sitemaps"""
+    session = session or requests.Session()
+    return iter_sitemap_urls(discover_sitemaps(main_url, robots), session, timeout)
@@ -0,0 +1,43 @@
+import os
+import sqlite3
+import threading
+
+def open_database(path, schema=None, synchronous=None):
+    """Open a SQLite file (creating its directory) that threads of this process can share.
+
+    The database is put in WAL mode so readers in other processes (e.g. site
+    audit workers) never block writers; ``schema`` is a script of ``CREATE ...
+    IF NOT EXISTS`` statements run once on open.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    if synchronous:
+        conn.execute(f"PRAGMA synchronous={synchronous}")
+    if schema:
+        conn.executescript(schema)
+    conn.commit()
+    return conn
+
+class SharedDefault:
+    """A process-wide instance of ``factory``, created on first use"""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.instance = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if self.instance is None:
+                self.instance = self.factory()
+        return self.instance
+
+    def resolve(self, value):
+        """Map an argument: None means the shared instance, False disables it, anything else is used as-is"""
+        if value is None:
+            return self.get()
+        return value or None
@@ -0,0 +1,47 @@
+from frontier import DONE, CrawlFrontier
+
+MAIN = "https://example.com/"
+
+def interrupted_crawl(path):
+    """A crawl that fetched some pages and was stopped before ``finish``"""
+    frontier = CrawlFrontier(path)
+    frontier.start(MAIN)
+    frontier.add_many([MAIN + "a", MAIN + "b", MAIN + "c", MAIN + "d", MAIN + "e"])
+    frontier.mark(MAIN, DONE, 200)
+    frontier.mark(MAIN + "a", DONE, 200)
+    frontier.mark_error(MAIN + "b", 503)
+    frontier.mark_error(MAIN + "c", 404)
+    frontier.close()
+
+def test_resume_requeues_only_pending_urls(tmp_path):
+    path = str(tmp_path / "frontier.sqlite")
+    interrupted_crawl(path)
+
+    frontier = CrawlFrontier(path)
+    assert frontier.start(MAIN) is True
+    # Fetched pages and permanent errors stay done; transient failures are retried, in discovery order
+    assert frontier.pending() == [MAIN + "b", MAIN + "d", MAIN + "e"]
+    assert frontier.links() == [MAIN, MAIN + "a", MAIN + "b", MAIN + "c", MAIN + "d", MAIN + "e"]
+    assert frontier.add(MAIN + "a") is False
+    frontier.close()
+
+def test_finished_crawl_starts_fresh(tmp_path):
+    path = str(tmp_path / "frontier.sqlite")
+    interrupted_crawl(path)
+    frontier = CrawlFrontier(path)
+    frontier.start(MAIN)
+    frontier.finish()
+    frontier.close()
+
+    frontier = CrawlFrontier(path)
+    assert frontier.start(MAIN) is False
+    assert frontier.pending() == [MAIN]
+    frontier.close()
+
+def test_other_start_url_starts_fresh(tmp_path):
+    path = str(tmp_path / "frontier.sqlite")
+    interrupted_crawl(path)
+    frontier = CrawlFrontier(path)
+    assert frontier.start("https://other.example/") is False
+    assert frontier.links() == ["https://other.example/"]
+    frontier.close()
@@ -0,0 +1,100 @@
+import pytest
+
+from htmlparser import PARSER_BACKENDS, compare_backends, is_available
+
+URL = "https://example.com/widgets/"
+
+ARTICLE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Handmade Widgets &amp; Gadgets | Example Shop</title>
+<meta name="description" content="Handmade widgets built to last, shipped worldwide from our small workshop.">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<meta name="robots" content="index, follow">
+<link rel="canonical" href="https://example.com/widgets/">
+<meta property="og:title" content="Handmade Widgets">
+<meta property="og:type" content="website">
+<meta name="twitter:card" content="summary">
+<script type="application/ld+json">{"@context": "https://schema.org", "@type": "Product", "name": "Widget"}</script>
+<script src="/static/app.js"></script>
+<style>body { font-family: sans-serif; }</style>
+</head>
+<body>
+<header><nav><a href="/">Home</a> <a href="/about/" title="About us">About</a></nav></header>
+<main>
+<article>
+<h1>Handmade Widgets</h1>
+<p>Our widgets are made by hand in a small workshop. Each widget is tested before it is shipped.</p>
+<h2>Why handmade widgets last longer</h2>
+<p>Handmade widgets use thicker steel. The joints were welded by experienced makers, and the finish is applied in three coats.</p>
+<img src="/img/widget.jpg" alt="A steel widget">
+<img src="/img/workshop.jpg">
+<h3>Care instructions</h3>
+<ul><li>Keep widgets dry.</li><li>Oil the hinges once a year.</li></ul>
+<p>Questions? <a href="https://partner.example.org/" rel="nofollow">Ask our partner</a> or <a href="/contact/"></a>.</p>
+</article>
+</main>
+<footer><p>&copy; 2024 Example Shop</p></footer>
+<script>window.dataLayer = [];</script>
+</body>
+</html>
+"""
+
+# Sloppy but explicitly closed blocks: unclosed list items and inline tags, implied <tbody>,
+# a stray end tag and unquoted attributes
+SLOPPY = """<html>
+<head>
+<title>Widget   Catalogue</title>
+<meta name=description content="All our widgets in one place">
+</head>
+<body>
+<h1>Widget catalogue</h1>
+<p>Browse every widget we make. Prices include shipping.</p>
+<p>New widgets are added each month, so check back often.</p>
+<ul>
+<li>Steel widgets
+<li>Brass widgets
+<li><a href=/widgets/copper/>Copper widgets</a>
+</ul>
+<table>
+<tr><td>Steel</td><td>$20</td></tr>
+<tr><td>Brass</td><td>$35</td></tr>
+</table>
+<h2>Custom orders</h2></span>
+<p>Custom widgets are quoted by email. <b>Orders are shipped within two weeks.</p>
+<img src=/img/custom.png alt=Custom widget>
+</body>
+</html>
+"""
+
+# 'html.parser' nests everything after an unclosed <h1> or <p> inside it, while lxml and
+# html5-parser close them implicitly as browsers do, so headings and paragraphs differ
+UNCLOSED_BLOCKS = """<html><head><title>Widget catalogue</title></head>
+<body>
+<h1>Widget catalogue
+<p>Browse every widget we make. Prices include shipping.
+<p>New widgets are added each month, so check back often.
+<h2>Custom orders</h2>
+</body></html>
+"""
+
+MINIMAL = "<title>Widgets</title><p>Just one short paragraph about widgets."
+
+PAGES = {"article": ARTICLE, "sloppy": SLOPPY, "minimal": MINIMAL}
+
+def require(backend):
+    if not is_available(backend):
+        pytest.skip(f"{backend} is not installed")
+
+@pytest.mark.parametrize("backend", PARSER_BACKENDS)
+@pytest.mark.parametrize("page", sorted(PAGES))
+def test_backend_matches_html_parser(backend, page):
+    require(backend)
+    assert compare_backends(PAGES[page], URL, [backend]) == {backend: []}
+
+@pytest.mark.parametrize("backend", [backend for backend in PARSER_BACKENDS if backend != 'html.parser'])
+def test_unclosed_blocks_differ(backend):
+    require(backend)
+    differing = compare_backends(UNCLOSED_BLOCKS, URL, [backend])[backend]
+    assert "on_page" in differing
@@ -0,0 +1,121 @@
+import http.server
+import sqlite3
+import threading
+from email.utils import formatdate
+
+import pytest
+
+from httpcache import BodyReader, BodyRejected, CachedResponse, HTTPCache, freshness_lifetime
+
+PAGE = b"<html><body>" + b"cached page " * 50 + b"</body></html>"
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    """Serves ``PAGE`` with an ETag, answering matching conditional requests with 304"""
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get('If-None-Match')))
+        if self.path == '/large':
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html')
+            self.end_headers()
+            self.wfile.write(b"x" * 5000)
+            return
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.send_header('ETag', '"v1"')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(PAGE)))
+        self.send_header('ETag', '"v1"')
+        self.send_header('Cache-Control', self.server.cache_control)
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    httpd.requests = []
+    httpd.cache_control = 'max-age=0'
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+def base_url(httpd):
+    return f"http://127.0.0.1:{httpd.server_address[1]}"
+
+def test_revalidation_returns_cached_body(tmp_path, server):
+    cache = HTTPCache(str(tmp_path / "cache.sqlite"))
+    url = base_url(server) + "/page"
+    first = cache.fetch(url)
+    second = cache.fetch(url)
+
+    assert server.requests == [("/page", None), ("/page", '"v1"')]
+    assert first.content == second.content == PAGE
+    assert second.status_code == 200 and second.from_cache
+    assert second.text == PAGE.decode()
+
+def test_fresh_entry_is_served_without_request(tmp_path, server):
+    server.cache_control = 'max-age=3600'
+    cache = HTTPCache(str(tmp_path / "cache.sqlite"))
+    url = base_url(server) + "/page"
+    cache.fetch(url)
+    assert cache.fetch(url).content == PAGE
+    assert len(server.requests) == 1
+
+def test_no_cache_is_always_revalidated(tmp_path, server):
+    server.cache_control = 'no-cache'
+    cache = HTTPCache(str(tmp_path / "cache.sqlite"), fresh_for=600)
+    url = base_url(server) + "/page"
+    cache.fetch(url)
+    cache.fetch(url)
+    assert server.requests == [("/page", None), ("/page", '"v1"')]
+
+def test_body_cap_raises_body_rejected(tmp_path, server):
+    # No Content-Length, so the cap is hit mid-stream
+    cache = HTTPCache(str(tmp_path / "cache.sqlite"), max_body_bytes=1000)
+    with pytest.raises(BodyRejected):
+        cache.fetch(base_url(server) + "/large")
+    # Announced lengths are refused before reading anything
+    with pytest.raises(BodyRejected):
+        BodyReader("https://example.com/", max_bytes=100, content_length="101")
+    reader = BodyReader("https://example.com/", max_bytes=100)
+    reader.feed(b"a" * 100)
+    with pytest.raises(BodyRejected):
+        reader.feed(b"a")
+
+@pytest.mark.parametrize("headers, lifetime", [
+    ({}, 600),
+    ({'Cache-Control': 'public, max-age=60'}, 60),
+    ({'Cache-Control': 'no-cache'}, 0),
+    ({'Cache-Control': 'no-store'}, 0),
+    ({'Pragma': 'no-cache'}, 0),
+    ({'Cache-Control': 'max-age=60', 'Expires': formatdate(0, usegmt=True)}, 60),
+    ({'Date': formatdate(1000, usegmt=True), 'Expires': formatdate(1300, usegmt=True)}, 300),
+    ({'Expires': '0'}, 0),
+])
+def test_freshness_lifetime(headers, lifetime):
+    assert freshness_lifetime(headers, 600, fetched_at=1000) == lifetime
+
+def test_timing_is_stored_with_the_page(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    # A cache created before timings were stored
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE responses (url TEXT PRIMARY KEY, final_url TEXT, status INTEGER, headers TEXT, "
+                 "body BLOB, encoding TEXT, etag TEXT, last_modified TEXT, elapsed REAL, fetched_at REAL)")
+    conn.close()
+
+    cache = HTTPCache(path)
+    page = CachedResponse("https://example.com/", 200, {}, PAGE, elapsed=0.25)
+    page.timing = {"ttfb_ms": 120.5, "redirects": []}
+    cache.store("https://example.com/", page)
+    cache.store("https://example.com/untimed", CachedResponse("https://example.com/untimed", 200, {}, PAGE))
+
+    assert cache.get("https://example.com/")[0].timing == page.timing
+    assert cache.get("https://example.com/untimed")[0].timing is None
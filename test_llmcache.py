@@ -0,0 +1,100 @@
+import pytest
+
+import llmcache
+from llmcache import CachedModel, FakeModel, LLMCache, make_model
+
+MODEL = "gemini-test"
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llmcache.time, 'time', clock)
+    return clock
+
+def cached_model(tmp_path, responses=None, **options):
+    fake = FakeModel(responses)
+    return CachedModel(fake, MODEL, LLMCache(str(tmp_path / "llm.sqlite"), **options)), fake
+
+def test_cache_hit_skips_model(tmp_path, clock):
+    model, fake = cached_model(tmp_path, {"keywords": '{"keywords": ["widgets"]}'})
+    first = model.generate_content("Suggest keywords for widgets")
+    # Re-wrapped copies of a prompt share the entry
+    second = model.generate_content("Suggest   keywords\n  for widgets")
+
+    assert first.text == second.text == '{"keywords": ["widgets"]}'
+    assert fake.calls == ["Suggest keywords for widgets"]
+    assert (model.cache.hits, model.cache.misses) == (1, 1)
+
+def test_expired_entry_is_refetched(tmp_path, clock):
+    model, fake = cached_model(tmp_path, ttl=60)
+    model.generate_content("prompt")
+    clock.now += 59
+    model.generate_content("prompt")
+    assert len(fake.calls) == 1
+    clock.now += 1
+    model.generate_content("prompt")
+    assert len(fake.calls) == 2
+
+def test_least_recently_used_entry_is_evicted(tmp_path, clock):
+    model, fake = cached_model(tmp_path, max_entries=2)
+    for prompt in ("a", "b"):
+        model.generate_content(prompt)
+        clock.now += 1
+    # Reading "a" makes "b" the least recently used entry
+    model.generate_content("a")
+    clock.now += 1
+    model.generate_content("c")
+
+    assert model.cache.get(MODEL, "a") is not None
+    assert model.cache.get(MODEL, "b") is None
+    assert model.cache.get(MODEL, "c") is not None
+
+def test_byte_limit_evicts_oldest(tmp_path, clock):
+    cache = LLMCache(str(tmp_path / "llm.sqlite"), max_bytes=10)
+    cache.put(MODEL, "a", "x" * 6)
+    clock.now += 1
+    cache.put(MODEL, "b", "y" * 6)
+    assert cache.get(MODEL, "a") is None
+    assert cache.get(MODEL, "b") == "y" * 6
+
+def test_errors_are_not_cached(tmp_path, clock):
+    answers = iter([RuntimeError("quota exceeded"), "", "ok"])
+
+    def respond(prompt):
+        answer = next(answers)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    model, fake = cached_model(tmp_path, respond)
+    with pytest.raises(RuntimeError):
+        model.generate_content("prompt")
+    assert model.generate_content("prompt").text == ""
+    assert model.generate_content("prompt").text == "ok"
+    assert model.generate_content("prompt").text == "ok"
+    assert len(fake.calls) == 3
+
+def test_non_text_prompts_bypass_cache(tmp_path, clock):
+    model, fake = cached_model(tmp_path)
+    model.generate_content(["chat", "history"])
+    model.generate_content("prompt", stream=True)
+    model.generate_content(["chat", "history"])
+    assert len(fake.calls) == 3
+    assert model.cache.misses == 0
+
+def test_make_model_backends(tmp_path):
+    cache = LLMCache(str(tmp_path / "llm.sqlite"))
+    model = make_model(MODEL, cache=cache, backend="fake")
+    assert isinstance(model, CachedModel) and isinstance(model.model, FakeModel)
+    # Fake answers are stored under their own model name
+    assert model.model_name == "fake:" + MODEL
+    assert isinstance(make_model(MODEL, cache=False, backend="fake"), FakeModel)
+    with pytest.raises(ValueError):
+        make_model(MODEL, cache=False, backend="openai")
@@ -0,0 +1,56 @@
+import asyncio
+import http.server
+import threading
+
+import pytest
+
+from domfacts import DomFacts
+from pageweight import collect_resources, measure_page_weight, measure_page_weight_async
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    """Answers HEAD for any path with a 2 KB cacheable resource"""
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/javascript')
+        self.send_header('Content-Length', '2048')
+        self.send_header('Cache-Control', 'max-age=3600')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+def page_facts(*script_sources):
+    facts = DomFacts()
+    facts.script_sources = list(script_sources)
+    return facts
+
+def test_malformed_urls_are_skipped():
+    facts = page_facts("/app.js", "http://[bad/lib.js", "data:text/javascript,1", "/app.js")
+    assert collect_resources(facts, "https://example.com/page") == [("https://example.com/app.js", "script")]
+
+def test_sync_call_outside_a_loop(server):
+    weight = measure_page_weight(page_facts("/app.js"), server + "/")
+    assert weight["total_bytes"] == 2048 and weight["failed_count"] == 0
+
+def test_sync_call_inside_a_running_loop(server):
+    async def analyze():
+        # As when the analyzer runs inside an async app
+        return measure_page_weight(page_facts("/app.js", "/vendor.js"), server + "/")
+
+    weight = asyncio.run(analyze())
+    assert weight["resource_count"] == 2 and weight["total_bytes"] == 4096
+
+def test_awaitable_entry_point(server):
+    weight = asyncio.run(measure_page_weight_async(page_facts("/app.js"), server + "/"))
+    assert weight["by_type"]["script"]["bytes"] == 2048
+    assert weight["uncacheable_count"] == 0
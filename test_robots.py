@@ -0,0 +1,70 @@
+import pytest
+
+from robots import RobotsRules, parse_robots
+from sitemap import discover_sitemaps
+
+ROBOTS = """
+User-agent: *
+Disallow: /shop/
+Allow: /shop/public/
+Disallow: /shop/public/drafts/
+Allow: /page
+Disallow: /page
+Disallow: /*.pdf$
+Disallow: /search?q=
+Crawl-delay: 2
+
+User-agent: AstuteBot
+Disallow: /private/
+
+Sitemap: https://example.com/sitemap.xml
+Sitemap: https://example.com/news-sitemap.xml
+"""
+
+@pytest.mark.parametrize("path, allowed", [
+    ("/", True),
+    ("/shop/", False),
+    ("/shop/cart", False),
+    # The longest matching rule wins, whichever order the rules were written in
+    ("/shop/public/widget", True),
+    ("/shop/public/drafts/widget", False),
+    # Allow wins a tie between equally long rules
+    ("/page", True),
+    ("/files/manual.pdf", False),
+    ("/files/manual.pdf?download=1", True),
+    ("/search?q=widgets", False),
+    ("/search", True),
+])
+def test_longest_match_precedence(path, allowed):
+    rules = parse_robots(ROBOTS)
+    assert rules.allowed("https://example.com" + path) is allowed
+
+def test_most_specific_agent_group():
+    rules = parse_robots(ROBOTS, user_agent="Mozilla/5.0 (compatible; AstuteBot/1.0)")
+    assert not rules.allowed("https://example.com/private/report")
+    assert rules.allowed("https://example.com/shop/")
+    assert rules.crawl_delay is None
+
+def test_crawl_delay_and_sitemaps():
+    rules = parse_robots(ROBOTS)
+    assert rules.crawl_delay == 2
+    assert rules.sitemaps == ["https://example.com/sitemap.xml", "https://example.com/news-sitemap.xml"]
+
+def test_percent_encoded_paths_match():
+    rules = parse_robots("User-agent: *\nDisallow: /caf%C3%A9/\n")
+    assert not rules.allowed("https://example.com/café/menu")
+
+class FakeRobots:
+    def __init__(self, rules):
+        self.rules = rules
+
+    def rules_for(self, url):
+        return self.rules
+
+def test_sitemaps_come_from_robots_rules():
+    assert discover_sitemaps("https://example.com/", FakeRobots(parse_robots(ROBOTS))) == [
+        "https://example.com/sitemap.xml", "https://example.com/news-sitemap.xml"]
+    assert discover_sitemaps("https://example.com/", FakeRobots(RobotsRules.allow_all())) == [
+        "https://example.com/sitemap.xml"]
+    # robots=False ignores robots.txt, as it does for the crawler
+    assert discover_sitemaps("https://example.com/a/b", False) == ["https://example.com/sitemap.xml"]
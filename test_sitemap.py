@@ -0,0 +1,51 @@
+import gzip
+
+from sitemap import iter_sitemap_entries
+
+IMAGE_SITEMAP = b"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+        xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">
+  <url>
+    <loc>https://ex.com/page1</loc>
+    <image:image><image:loc>https://ex.com/img1.jpg</image:loc></image:image>
+  </url>
+  <url>
+    <image:image><image:loc>https://ex.com/img2.jpg</image:loc></image:image>
+    <loc>https://ex.com/page2</loc>
+    <lastmod>2024-01-01</lastmod>
+  </url>
+</urlset>
+"""
+
+SITEMAP_INDEX = b"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://ex.com/sitemap-posts.xml.gz</loc></sitemap>
+  <sitemap><loc>https://ex.com/sitemap-pages.xml</loc><lastmod>2024-01-01</lastmod></sitemap>
+</sitemapindex>
+"""
+
+def chunked(data, size):
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+def test_image_locs_do_not_replace_page_urls():
+    assert list(iter_sitemap_entries([IMAGE_SITEMAP])) == [
+        ("url", "https://ex.com/page1"),
+        ("url", "https://ex.com/page2"),
+    ]
+
+def test_gzipped_sitemap_index():
+    expected = [("sitemap", "https://ex.com/sitemap-posts.xml.gz"), ("sitemap", "https://ex.com/sitemap-pages.xml")]
+    body = gzip.compress(SITEMAP_INDEX)
+    assert list(iter_sitemap_entries([body])) == expected
+    assert list(iter_sitemap_entries(chunked(body, 7))) == expected
+
+def test_short_first_chunk():
+    expected = [("url", "https://ex.com/page1"), ("url", "https://ex.com/page2")]
+    body = gzip.compress(IMAGE_SITEMAP)
+    assert list(iter_sitemap_entries([body[:1], b"", body[1:]])) == expected
+    assert list(iter_sitemap_entries(chunked(body, 1))) == expected
+    assert list(iter_sitemap_entries([IMAGE_SITEMAP[:1], IMAGE_SITEMAP[1:]])) == expected
+
+def test_unnamespaced_sitemap():
+    body = b"<urlset><url><loc> https://ex.com/a </loc></url><url><loc>https://ex.com/b</loc></url></urlset>"
+    assert list(iter_sitemap_entries(chunked(body, 5))) == [("url", "https://ex.com/a"), ("url", "https://ex.com/b")]
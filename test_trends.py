@@ -0,0 +1,97 @@
+import datetime
+import http.server
+import json
+import threading
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from trends import FixtureBackend, TrendsCache, TrendsService, date_bucket
+
+TIMELINE = {"interest_over_time": {"timeline_data": [{"date": "Jan 2024", "values": [{"value": "42"}]}]}}
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    """A SerpAPI stand-in: failing keywords get a non-2xx status, anything else a trends timeline"""
+
+    def do_GET(self):
+        keyword = parse_qs(urlparse(self.path).query)["q"][0]
+        self.server.requests.append(keyword)
+        if keyword == "server error":
+            self.reply(500, {"search_metadata": {"status": "Error"}})
+        elif keyword == "bad key":
+            self.reply(401, {"error": "Invalid API key"})
+        else:
+            self.reply(200, TIMELINE)
+
+    def reply(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+def service_for(httpd, cache, **options):
+    base_url = f"http://127.0.0.1:{httpd.server_address[1]}/search.json"
+    return TrendsService("test-key", base_url=base_url, cache=cache, requests_per_second=1000, **options)
+
+@pytest.mark.parametrize("today, days, bucket", [
+    (datetime.date(2024, 3, 5), 1, "2024-03-05"),
+    # Every day of a window shares its first day's bucket
+    (datetime.date(2024, 3, 3), 7, "2024-03-03"),
+    (datetime.date(2024, 3, 9), 7, "2024-03-03"),
+    (datetime.date(2024, 3, 10), 7, "2024-03-10"),
+])
+def test_date_bucket(today, days, bucket):
+    assert date_bucket(days, today=today) == bucket
+
+def test_repeat_lookups_use_cache(tmp_path, server):
+    cache = TrendsCache(str(tmp_path / "trends.sqlite"))
+    first = service_for(server, cache).fetch_many(["widgets"])
+    # A new service on the same cache, with the keyword spelled differently
+    second = service_for(server, cache).fetch_many(["  Widgets "])
+
+    assert server.requests == ["widgets"]
+    assert first[0]["timeline_data"] == second[0]["timeline_data"] == TIMELINE["interest_over_time"]["timeline_data"]
+    assert cache.get("widgets", "google_trends", date_bucket()) == TIMELINE
+
+def test_failed_requests_are_not_cached(tmp_path, server):
+    cache = TrendsCache(str(tmp_path / "trends.sqlite"))
+    service = service_for(server, cache)
+    assert service.fetch_many(["server error", "bad key", "widgets"])[:2] == [None, None]
+    assert service.errors == {"server error": "HTTP 500: Internal Server Error", "bad key": "HTTP 401: Invalid API key"}
+    assert cache.get("server error", "google_trends", date_bucket()) is None
+    assert cache.get("bad key", "google_trends", date_bucket()) is None
+
+    service.fetch_many(["server error", "bad key"])
+    assert sorted(server.requests) == sorted(["server error", "bad key", "widgets", "server error", "bad key"])
+
+def test_backend_replaces_http(tmp_path, server):
+    backend = FixtureBackend({"widgets": TIMELINE})
+    service = service_for(server, False, backend=backend)
+    results = service.fetch_many(["widgets", "gadgets"])
+
+    assert server.requests == []
+    assert backend.calls == ["widgets", "gadgets"]
+    assert results[0]["keyword"] == "widgets" and results[1] is None
+    assert service.errors == {"gadgets": "No fixture for 'gadgets'"}
+
+def test_fixture_directory(tmp_path):
+    (tmp_path / "handmade widgets.json").write_text(json.dumps(TIMELINE), encoding="utf-8")
+    service = TrendsService("test-key", cache=False, backend=FixtureBackend(str(tmp_path)))
+    results = service.fetch_many(["Handmade  Widgets", "gadgets"])
+    assert results[0]["timeline_data"] == TIMELINE["interest_over_time"]["timeline_data"]
+    assert results[1] is None
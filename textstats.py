@@ -0,0 +1,163 @@
+import numpy as np
+
+# Flesch Reading Ease bands, highest first
+READABILITY_LEVELS = (
+    (90, "Very Easy"),
+    (80, "Easy"),
+    (70, "Fairly Easy"),
+    (60, "Standard"),
+    (50, "Fairly Difficult"),
+    (30, "Difficult"),
+)
+LONG_SENTENCE_WORDS = 20
+# Sentences scoring below this (on their own) count as hard to read
+HARD_SENTENCE_SCORE = 30
+
+BE_FORMS = frozenset([b'am', b'is', b'are', b'was', b'were', b'be', b'been', b'being'])
+# Past participles that do not end in -ed
+IRREGULAR_PARTICIPLES = frozenset([
+    b'been', b'begun', b'bitten', b'blown', b'born', b'bought', b'brought', b'built', b'caught', b'chosen',
+    b'done', b'drawn', b'driven', b'eaten', b'fallen', b'felt', b'found', b'forgotten', b'given', b'gone',
+    b'grown', b'held', b'hidden', b'kept', b'known', b'laid', b'led', b'left', b'lost', b'made', b'meant',
+    b'met', b'paid', b'put', b'read', b'run', b'said', b'seen', b'sent', b'set', b'shown', b'sold', b'spent',
+    b'spoken', b'stolen', b'taken', b'taught', b'thought', b'told', b'understood', b'won', b'worn', b'written',
+])
+
+LOWER_A, LOWER_Z = ord('a'), ord('z')
+VOWELS = np.frombuffer(b'aeiouy', dtype=np.uint8)
+TERMINATORS = np.frombuffer(b'.!?', dtype=np.uint8)
+BE_INITIALS = np.frombuffer(b'abiw', dtype=np.uint8)
+DIGITS = np.frombuffer(b'0123456789', dtype=np.uint8)
+# Joins segments; never part of a word and always ends a sentence
+SEGMENT_SEPARATOR = b'\x00'
+
+def readability_level(score):
+    for threshold, level in READABILITY_LEVELS:
+        if score >= threshold:
+            return level
+    return "Very Difficult"
+
+def flesch(words, sentences, syllables):
+    """Flesch Reading Ease: 206.835 - 1.015 × (words/sentences) - 84.6 × (syllables/words), clipped to 0-100.
+
+    Text without words scores 100, as the formula gives for zero averages.
+    """
+    words = np.asarray(words, dtype=np.float64)
+    safe_words = np.maximum(words, 1)
+    scores = 206.835 - 1.015 * words / np.maximum(sentences, 1) - 84.6 * syllables / safe_words
+    return np.where(words > 0, np.clip(scores, 0, 100), 100)
+
+class TextStats:
+    """Word, sentence and readability statistics for one or more text segments, in one vectorized pass.
+
+    The segments (a page's text and its paragraphs) are joined and scanned as a
+    single byte array. Word boundaries, vowel groups (syllables), sentence
+    terminators and segment boundaries are boolean masks over that array, and
+    per-word, per-sentence and per-segment totals come from ``bincount`` over
+    running ids. Python only looks at possible forms of 'be' and the words
+    right after them, for the passive-voice check.
+    """
+
+    def __init__(self, segments):
+        self.segment_count = len(segments)
+        data = SEGMENT_SEPARATOR.join(segment.lower().encode('ascii', 'ignore').replace(b"'", b"")
+                                      for segment in segments)
+        chars = np.frombuffer(data, dtype=np.uint8)
+
+        letter = (chars >= LOWER_A) & (chars <= LOWER_Z)
+        prev_letter = np.concatenate(([False], letter[:-1]))
+        next_letter = np.concatenate((letter[1:], [False]))
+        word_start = letter & ~prev_letter
+        word_end = letter & ~next_letter
+        char_word = np.cumsum(word_start) - 1
+        word_starts = np.flatnonzero(word_start)
+        word_ends = np.flatnonzero(word_end)
+        word_count = len(word_starts)
+        self.word_lengths = word_ends - word_starts + 1
+
+        # Syllables: vowel groups per word, less a silent final 'e' ('make', but not 'table'), at least one
+        vowel = np.isin(chars, VOWELS) & letter & ~(word_start & (chars == ord('y')))
+        vowel_group = vowel & ~np.concatenate(([False], vowel[:-1]))
+        syllables = np.bincount(char_word[vowel_group], minlength=word_count)
+        ends = chars[word_ends]
+        before_end = chars[np.maximum(word_ends - 1, 0)]
+        silent_e = (ends == ord('e')) & (before_end != ord('l')) & (syllables > 1) & (self.word_lengths > 2)
+        self.syllables = np.maximum(syllables - silent_e, 1)
+
+        # Sentences end at runs of . ! ? (not decimal points) and at every segment boundary
+        prev_chars = np.concatenate(([0], chars[:-1]))
+        next_chars = np.concatenate((chars[1:], [0]))
+        terminator = np.isin(chars, TERMINATORS) & ~(
+            (chars == ord('.')) & np.isin(prev_chars, DIGITS) & np.isin(next_chars, DIGITS))
+        separator = chars == SEGMENT_SEPARATOR[0]
+        boundary = terminator | separator
+        boundary_start = boundary & ~np.concatenate(([False], boundary[:-1]))
+        word_sentence_raw = np.cumsum(boundary_start)[word_starts]
+        # Renumber so only sentences with words get ids
+        sentence_keys, self.word_sentence = np.unique(word_sentence_raw, return_inverse=True)
+        self.word_segment = np.cumsum(separator)[word_starts]
+        self.sentence_segment = self.word_segment[np.searchsorted(word_sentence_raw, sentence_keys)]
+        sentence_count = len(sentence_keys)
+
+        # Passive voice: a form of 'be' followed by a participle, optionally with an -ly adverb between.
+        # Only short words that could be a form of 'be', and the two words after one, are looked up.
+        def lookup(positions, vocabulary):
+            found = np.zeros(word_count, dtype=bool)
+            found[positions] = [data[start:end + 1] in vocabulary for start, end in
+                                zip(word_starts[positions].tolist(), word_ends[positions].tolist())]
+            return found
+
+        be_candidates = np.flatnonzero((self.word_lengths <= 5) & np.isin(chars[word_starts], BE_INITIALS))
+        is_be = lookup(be_candidates, BE_FORMS)
+        after_be = np.unique(np.minimum(np.concatenate((np.flatnonzero(is_be) + 1, np.flatnonzero(is_be) + 2)),
+                                        max(word_count - 1, 0)))
+        participle = ((ends == ord('d')) & (before_end == ord('e')) & (self.word_lengths > 3)) | lookup(
+            after_be, IRREGULAR_PARTICIPLES)
+        adverb = (ends == ord('y')) & (before_end == ord('l'))
+        passive = np.zeros(word_count, dtype=bool)
+        if word_count > 1:
+            same_sentence = self.word_sentence[1:] == self.word_sentence[:-1]
+            passive[:-1] = is_be[:-1] & participle[1:] & same_sentence
+        if word_count > 2:
+            passive[:-2] |= (is_be[:-2] & adverb[1:-1] & participle[2:] &
+                             (self.word_sentence[2:] == self.word_sentence[:-2]))
+
+        self.sentence_words = np.bincount(self.word_sentence, minlength=sentence_count)
+        self.sentence_syllables = np.bincount(self.word_sentence, weights=self.syllables, minlength=sentence_count)
+        self.sentence_passive = np.bincount(self.word_sentence, weights=passive, minlength=sentence_count) > 0
+        self.sentence_scores = flesch(self.sentence_words, 1, self.sentence_syllables)
+
+        self.segment_words = np.bincount(self.word_segment, minlength=self.segment_count)
+        self.segment_syllables = np.bincount(self.word_segment, weights=self.syllables,
+                                             minlength=self.segment_count)
+        self.segment_sentences = np.bincount(self.sentence_segment, minlength=self.segment_count)
+        self.segment_long = np.bincount(self.sentence_segment, weights=self.sentence_words > LONG_SENTENCE_WORDS,
+                                        minlength=self.segment_count)
+        self.segment_passive = np.bincount(self.sentence_segment, weights=self.sentence_passive,
+                                           minlength=self.segment_count)
+        self.segment_hard = np.bincount(self.sentence_segment, weights=self.sentence_scores < HARD_SENTENCE_SCORE,
+                                        minlength=self.segment_count)
+        self.segment_scores = flesch(self.segment_words, self.segment_sentences, self.segment_syllables)
+
+    def segment_summary(self, segment):
+        """The readability dict ``SEOAnalyzer`` reports, for one segment"""
+        words = int(self.segment_words[segment])
+        sentences = int(self.segment_sentences[segment]) or 1
+        score = round(float(self.segment_scores[segment]))
+        return {
+            "flesch_score": score,
+            "level": readability_level(score),
+            "words_per_sentence": round(words / sentences, 1),
+            "syllables_per_word": round(float(self.segment_syllables[segment]) / words, 2) if words else 0,
+            "sentence_count": int(self.segment_sentences[segment]),
+            "long_sentence_ratio": round(float(self.segment_long[segment]) / sentences, 3),
+            "passive_voice_ratio": round(float(self.segment_passive[segment]) / sentences, 3),
+            "hard_sentence_ratio": round(float(self.segment_hard[segment]) / sentences, 3),
+        }
+
+def page_readability(text, paragraphs=()):
+    """Readability of a page's text plus a Flesch score for each of its ``paragraphs``"""
+    stats = TextStats([text, *paragraphs])
+    summary = stats.segment_summary(0)
+    summary["paragraph_scores"] = [round(float(score)) for score in stats.segment_scores[1:]]
+    return summary
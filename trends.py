@@ -0,0 +1,173 @@
+import asyncio
+import datetime
+import json
+import os
+import threading
+import time
+import zlib
+
+import aiohttp
+
+from politeness import HostScheduler, THROTTLE_STATUSES
+from sqlitestore import SharedDefault, open_database
+
+SERPAPI_URL = "https://serpapi.com/search.json"
+DEFAULT_TRENDS_CACHE_PATH = os.path.join('.cache', 'trends_cache.sqlite')
+THROTTLE_RETRIES = 2
+
+def date_bucket(days=1, today=None):
+    """Cache bucket for today: the first date of the current ``days``-long window"""
+    today = today or datetime.date.today()
+    return datetime.date.fromordinal(today.toordinal() - today.toordinal() % days).isoformat()
+
+def normalize_keyword(keyword):
+    return " ".join(keyword.lower().split())
+
+def summarize_trends(keyword, results):
+    """The fields the keyword research view shows, from a raw google_trends response"""
+    return {
+        "keyword": keyword,
+        "search_volume": results.get("search_parameters", {}).get("search_volume", 0),
+        "competition": results.get("competition", "Medium"),
+        "timeline_data": results.get("interest_over_time", {}).get("timeline_data", results.get("timeline_data", [])),
+    }
+
+class TrendsCache:
+    """On-disk cache of raw SerpAPI responses keyed by (keyword, engine, date bucket)"""
+
+    def __init__(self, path=DEFAULT_TRENDS_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = open_database(path, """
+            CREATE TABLE IF NOT EXISTS trends (
+                keyword TEXT NOT NULL,
+                engine TEXT NOT NULL,
+                bucket TEXT NOT NULL,
+                results BLOB NOT NULL,
+                fetched_at REAL,
+                PRIMARY KEY (keyword, engine, bucket)
+            )
+        """)
+
+    def get(self, keyword, engine, bucket):
+        with self._lock:
+            row = self.conn.execute("SELECT results FROM trends WHERE keyword = ? AND engine = ? AND bucket = ?",
+                                    (normalize_keyword(keyword), engine, bucket)).fetchone()
+        return json.loads(zlib.decompress(row[0])) if row else None
+
+    def store(self, keyword, engine, bucket, results):
+        with self._lock:
+            self.conn.execute("INSERT OR REPLACE INTO trends VALUES (?, ?, ?, ?, ?)",
+                              (normalize_keyword(keyword), engine, bucket,
+                               zlib.compress(json.dumps(results).encode('utf-8')), time.time()))
+            self.conn.commit()
+
+class FixtureBackend:
+    """Offline stand-in for SerpAPI: serves responses from a dict or a directory of ``<keyword>.json`` files"""
+
+    def __init__(self, fixtures):
+        self.fixtures = fixtures
+        self.calls = []
+
+    async def fetch(self, session, params):
+        keyword = params["q"]
+        self.calls.append(keyword)
+        if isinstance(self.fixtures, dict):
+            return self.fixtures.get(keyword, {"error": f"No fixture for '{keyword}'"})
+        path = os.path.join(self.fixtures, f"{normalize_keyword(keyword)}.json")
+        if not os.path.exists(path):
+            return {"error": f"No fixture for '{keyword}'"}
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+class TrendsService:
+    """Fetch SerpAPI trend data for many keywords at once.
+
+    Up to ``max_concurrency`` requests are in flight, and request starts are
+    paced per API key by a ``HostScheduler`` (at most ``requests_per_second``,
+    backing off on 429/503). Responses are cached per (keyword, engine, date
+    bucket), so repeat lookups within ``bucket_days`` make no request.
+    ``base_url`` can point at a local stub server, and ``backend`` (e.g. a
+    ``FixtureBackend``) replaces HTTP entirely.
+    """
+
+    def __init__(self, api_key, engine="google_trends", base_url=SERPAPI_URL, cache=None, backend=None,
+                 max_concurrency=8, requests_per_second=5.0, bucket_days=1, timeout=30):
+        self.api_key = api_key
+        self.engine = engine
+        self.base_url = base_url
+        # None = shared on-disk cache, False = always fetch
+        self.cache = _default_cache.resolve(cache)
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self.bucket_days = bucket_days
+        self.timeout = timeout
+        self.scheduler = HostScheduler(min_delay=1.0 / requests_per_second, target_concurrency=max_concurrency)
+        self.errors = {}
+
+    def params(self, keyword):
+        return {"engine": self.engine, "q": keyword, "data_type": "TIMESERIES", "api_key": self.api_key}
+
+    async def request(self, session, params):
+        # The rate limit is per API key, so that is the scheduler's "host"
+        for attempt in range(THROTTLE_RETRIES + 1):
+            await self.scheduler.wait(self.api_key)
+            started = time.monotonic()
+            async with session.get(self.base_url, params=params,
+                                   timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+                self.scheduler.record(self.api_key, time.monotonic() - started, response.status,
+                                      response.headers.get('Retry-After'))
+                if response.status in THROTTLE_STATUSES and attempt < THROTTLE_RETRIES:
+                    continue
+                if not 200 <= response.status < 300:
+                    # Any failed request is an error (and so never cached), even without an "error" key
+                    return {"error": f"HTTP {response.status}: {await self.error_detail(response)}"}
+                return await response.json(content_type=None)
+
+    @staticmethod
+    async def error_detail(response):
+        """SerpAPI's error message from a failed response, or the HTTP reason phrase"""
+        try:
+            body = await response.json(content_type=None)
+        except ValueError:
+            body = None
+        if isinstance(body, dict) and body.get("error"):
+            return body["error"]
+        return response.reason
+
+    async def fetch_one(self, session, slots, keyword):
+        """Trend summary for one keyword, or None (with the reason in ``errors``)"""
+        bucket = date_bucket(self.bucket_days)
+        results = self.cache.get(keyword, self.engine, bucket) if self.cache is not None else None
+        if results is None:
+            try:
+                async with slots:
+                    if self.backend is not None:
+                        results = await self.backend.fetch(session, self.params(keyword))
+                    else:
+                        results = await self.request(session, self.params(keyword))
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                self.errors[keyword] = str(e)
+                return None
+            if "error" in results:
+                self.errors[keyword] = results["error"]
+                return None
+            if self.cache is not None:
+                self.cache.store(keyword, self.engine, bucket, results)
+        return summarize_trends(keyword, results)
+
+    async def fetch_many_async(self, keywords):
+        slots = asyncio.Semaphore(self.max_concurrency)
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            return await asyncio.gather(*(self.fetch_one(session, slots, keyword) for keyword in keywords))
+
+    def fetch_many(self, keywords):
+        """Trend summaries for ``keywords`` in the same order, None where a lookup failed"""
+        self.errors = {}
+        return asyncio.run(self.fetch_many_async(list(keywords)))
+
+_default_cache = SharedDefault(TrendsCache)
+
+def get_default_trends_cache():
+    return _default_cache.get()